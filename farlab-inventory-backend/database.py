@@ -31,6 +31,26 @@ logger = get_logger(__name__)
 # Initialize as None for lazy loading
 background_engine = None
 BackgroundSessionLocal = None
+
+# Idempotent upgrades for tables that already exist: column additions that
+# create_all() cannot apply and data fixes needed before indexes are created
+SCHEMA_UPGRADES = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS full_name text "
+    "GENERATED ALWAYS AS (first_name || ' ' || last_name) STORED",
+    # The old check-then-insert alert logic could leave several active alerts
+    # for one part, which would stop uq_alerts_part_id_active from building.
+    # Keep the newest active alert per part and resolve the rest.
+    "UPDATE alerts SET is_active = false, is_resolved = true, resolved_at = now() "
+    "WHERE is_active AND id NOT IN ("
+    "SELECT DISTINCT ON (part_id) id FROM alerts WHERE is_active "
+    "ORDER BY part_id, created_at DESC, id DESC)",
+]
+# Unique indexes on lower(column) that fail to build if existing rows differ
+# only by case: index name -> column
+CASE_INSENSITIVE_UNIQUE_COLUMNS = {
+    "ix_users_username_lower": "username",
+    "ix_users_email_lower": "email",
+}
 DATABASE_URL = None
 engine = None
 SessionLocal = None
@@ -97,10 +117,10 @@ def get_database_url() -> str:
     for source_name, get_password in password_sources:
         try:
             if password := get_password():
-                logger.info(f"Database password loaded from {source_name}")
+                logger.info("Database password loaded from %s", source_name)
                 return construct_db_url(password)
         except Exception as e:
-            logger.warning(f"Failed to get password from {source_name}: {e}")
+            logger.warning("Failed to get password from %s: %s", source_name, e)
 
     raise ValueError("Database password not found from any source")
 
@@ -121,9 +141,33 @@ def initialize_database():
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         logger.info("Database engine initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: %s", e)
         raise
 
+class SchemaConflictError(RuntimeError):
+    """Existing data conflicts with an index and needs a manual fix."""
+
+
+def check_case_insensitive_duplicates(conn):
+    """
+    Raises SchemaConflictError listing users whose username or email differ
+    only by case. Such rows would make the unique lower() indexes fail to
+    build, and an admin has to decide which account to rename or merge.
+    """
+    conflicts = []
+    for index_name, column in CASE_INSENSITIVE_UNIQUE_COLUMNS.items():
+        rows = conn.execute(text(
+            f"SELECT lower({column}), string_agg({column}, ', ' ORDER BY id) "
+            f"FROM users GROUP BY lower({column}) HAVING count(*) > 1"
+        )).all()
+        conflicts.extend(
+            f"{column} '{key}' ({values}) blocks {index_name}" for key, values in rows)
+    if conflicts:
+        raise SchemaConflictError(
+            "Users differ only by case, rename them before starting the app: "
+            + "; ".join(conflicts))
+
+
 def create_tables():
     """Creates all database tables defined in the models."""
     max_retries = 5
@@ -144,22 +188,35 @@ def create_tables():
                 if result.scalar() == 0:
                     raise Exception("Public namespace not ready")
             
-            logger.info(f"Database connectivity verified (attempt {attempt + 1})")
+            logger.info("Database connectivity verified (attempt %s)", attempt + 1)
             
             # Now try to create tables
             Base.metadata.create_all(bind=engine)
+            with engine.begin() as conn:
+                for statement in SCHEMA_UPGRADES:
+                    conn.execute(text(statement))
+                check_case_insensitive_duplicates(conn)
+            # create_all() skips indexes on tables that already exist,
+            # so add any index declared after the table was first created
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=engine, checkfirst=True)
             logger.info("Database tables checked/created successfully")
             return  # Success - exit function
-            
+
+        except SchemaConflictError as e:
+            # Retrying won't fix the data
+            logger.error("Cannot create database indexes: %s", e)
+            raise
         except Exception as e:
-            logger.warning(f"Table creation attempt {attempt + 1} failed: {str(e)}")
+            logger.warning("Table creation attempt %s failed: %s", attempt + 1, e)
             
             if attempt == max_retries - 1:  # Last attempt
                 logger.error("All table creation attempts failed")
                 raise
             
             # Wait before retry
-            logger.info(f"Retrying in {retry_delay} seconds...")
+            logger.info("Retrying in %s seconds...", retry_delay)
             time.sleep(retry_delay)
             retry_delay *= 1.5  # Exponential backoff
 
@@ -221,23 +278,6 @@ def setup_engine_monitoring(engine, engine_name: str):
         logger.debug("Database connection closed (%s): %s", 
                     engine_name, id(dbapi_connection))
 
-#------------------------------------------------------------------------------
-# Background Jobs
-#------------------------------------------------------------------------------
-def safe_scheduled_alert_job():
-    """Execute scheduled alert job with dedicated background session."""
-    from services.notification_service import send_periodic_alert_summary
-    from services.alert_service import get_low_stock_parts
-
-    with get_background_db_session() as db:
-        try:
-            with db.begin():
-                low_stock_parts = get_low_stock_parts(db)
-                if low_stock_parts:
-                    send_periodic_alert_summary(low_stock_parts, settings.ADMIN_EMAIL)
-        except Exception as e:
-            logger.error("Scheduled job failed: %s", e, exc_info=True)
-
 #------------------------------------------------------------------------------
 # Initialize Database and Monitoring
 #------------------------------------------------------------------------------
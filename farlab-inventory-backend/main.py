@@ -12,10 +12,12 @@ import time
 
 
 from database import get_db, create_tables, init_app as init_database_app
-from services.scheduler import start_scheduler, scheduler_instance, scheduled_alert_job
+from services import scheduler
+from services.scheduler import start_scheduler, shutdown_scheduler, scheduled_alert_job
 from utils.logging_config import get_logger
 from utils.config import settings
 from utils.create_admin import ensure_admin_exists
+from utils.security import warm_up_password_hashing
 
 # Import routers
 from routers import auth, users, instruments, parts, alerts
@@ -56,19 +58,21 @@ async def lifespan(app: FastAPI):
         except StopIteration:
             pass
 
+    # --- Load password hashing backends before the first login ---
+    warm_up_password_hashing()
+
     # --- Start the background scheduler ---
     logger.info("INFO: Starting background scheduler...")
-    start_scheduler()
+    start_scheduler(safe_scheduled_alert_job)
 
     yield  # The application runs while the lifespan context is active
 
     # Shutdown
     logger.info("INFO: Application shutdown...")
     
-    # Shutdown scheduler
-    if scheduler_instance and scheduler_instance.running:
-        logger.info("INFO: Shutting down scheduler...")
-        scheduler_instance.shutdown(wait=True)
+    # Shutdown scheduler and drain queued notifications
+    logger.info("INFO: Shutting down scheduler...")
+    await shutdown_scheduler()
         
     # Close database connections
     logger.info("INFO: Closing database connections...")
@@ -97,7 +101,7 @@ app.add_middleware(
     allow_credentials=True,  # Important for cookies and auth headers
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Accept", "Accept-Language", "Content-Language", "Content-Type", "Authorization"],  # ✅ Specific headers only
-    expose_headers=["X-Total-Count"], # Only expose what frontend needs
+    expose_headers=["X-Total-Count", "X-Next-Cursor"], # Only expose what frontend needs
 )
 
 # Add TrustedHost middleware for additional protection
@@ -196,7 +200,7 @@ async def health_check(db: Session = Depends(get_db)):
             "timestamp": int(time.time())
         }
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(
             status_code=503, # Service unavailable
             detail="Database connection failed"
@@ -233,7 +237,7 @@ async def scheduler_health_check():
         "scheduler_healthy": is_healthy,
         "issues": issues,
         "job_status": job_status,
-        "scheduler_running": scheduler_instance.running if scheduler_instance else False
+        "scheduler_running": scheduler.is_running()
     }    
 
 # Enhanced job wrapper with monitoring
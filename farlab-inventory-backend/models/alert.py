@@ -1,5 +1,5 @@
 # Alert settings and thresholds
-from sqlalchemy import Column, Integer, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from models.base import Base
@@ -36,6 +36,17 @@ class Alert(Base):
     # Relationship
     part = relationship("Part", backref="alerts", passive_deletes=True)
 
+    __table_args__ = (
+        # At most one active alert per part; also the ON CONFLICT target for alert inserts
+        Index("uq_alerts_part_id_active", part_id, unique=True,
+              postgresql_where=is_active.is_(True)),
+        # Keyset pagination of the alerts list (newest first)
+        Index("ix_alerts_active_created_at_id", is_active,
+              created_at.desc(), id.desc()),
+        # Active alert lookups and resolution per part
+        Index("ix_alerts_part_id_is_active", part_id, is_active),
+    )
+
     def __repr__(self):
         return f"<Alert(id={self.id}, part_id={self.part_id}, active={self.is_active})>"
 
@@ -51,6 +62,11 @@ class Alert(Base):
     @classmethod
     def create_low_stock_alert(cls, part):
         """ Create a low stock alert for a part. """
+        return cls(**cls.low_stock_alert_values(part))
+
+    @classmethod
+    def low_stock_alert_values(cls, part) -> dict:
+        """ Build the column values of a low stock alert for a part. """
         # Build detailed message with part information
         stock_message = "LOW STOCK ALERT!"
         parts_info = "Parts need to be purchased: \n"
@@ -85,7 +101,7 @@ class Alert(Base):
 
         message = "\n".join(message_alert)
 
-        return cls(
+        return dict(
             part_id=part.id,
             message=message,
             current_stock=part.quantity_in_stock,
@@ -1,7 +1,8 @@
 # /models/part.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, and_
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from models.base import Base
 from utils.logging_config import get_logger
 
@@ -44,6 +45,18 @@ class Part(Base):
     # Relationships
     instrument_parts = relationship(
         "InstrumentPart", back_populates="part", cascade="all, delete-orphan")
+    # The part's single active alert, if any (see uq_alerts_part_id_active)
+    active_alert = relationship(
+        "Alert",
+        primaryjoin="and_(Alert.part_id == Part.id, Alert.is_active.is_(True))",
+        uselist=False,
+        viewonly=True)
+
+    __table_args__ = (
+        # Low stock filters and the alert summary counts compare these columns
+        Index("ix_parts_stock_levels_active", quantity_in_stock,
+              minimum_stock_level, is_active),
+    )
 
     def __repr__(self):
         
@@ -58,13 +71,20 @@ class Part(Base):
     def __str__(self):
         return f"{self.part_number} - {self.name}"
 
-    @property
+    @hybrid_property
     def is_low_stock(self) -> bool:
         """
         Check if the part is below minimum stock level.
         """
         return self.quantity_in_stock <= self.minimum_stock_level and self.minimum_stock_level > 0
 
+    @is_low_stock.expression
+    def is_low_stock(cls):
+        """
+        SQL form of is_low_stock, usable in query filters.
+        """
+        return and_(cls.quantity_in_stock <= cls.minimum_stock_level, cls.minimum_stock_level > 0)
+
     @property
     def stock_status(self) -> str:
         """
@@ -104,11 +124,10 @@ class Part(Base):
 
         # Audit logging for transparency
         logger.info(
-            f"Stock updated for part {self.part_number}: "
-            f"{old_quantity} -> {self.quantity_in_stock} "
-            f"(change: {quantity_change})" +
-            (f", reason: {reason}" if reason else "") +
-            (f", forced critical: {force_critical}" if force_critical else "")
+            "Stock updated for part %s: %s -> %s (change: %s)%s%s",
+            self.part_number, old_quantity, self.quantity_in_stock, quantity_change,
+            f", reason: {reason}" if reason else "",
+            f", forced critical: {force_critical}" if force_critical else ""
         )
 
     @property
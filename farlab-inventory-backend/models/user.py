@@ -1,5 +1,5 @@
 # User table definition and relationships
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, Computed
 from sqlalchemy.sql import func
 from models.base import Base
 from utils.security import verify_password
@@ -19,6 +19,9 @@ class User(Base):
     email = Column(String(100), nullable=False, unique=True, index=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
+    # Stored generated column so list responses read it straight from the row
+    full_name = Column(Text, Computed(
+        "first_name || ' ' || last_name", persisted=True))
 
     # User details
     phone = Column(String(20), nullable=True)
@@ -41,10 +44,13 @@ class User(Base):
     ), onupdate=func.now(), nullable=False)
     last_login = Column(DateTime(timezone=True), nullable=True)
 
-    @property
-    def full_name(self) -> str:
-        """Return the user's full name."""
-        return f"{self.first_name} {self.last_name}"
+    # Case-insensitive uniqueness, also used by the duplicate user checks
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        # Admin existence check at startup only scans the (few) admin rows
+        Index("ix_users_is_admin_partial", id, postgresql_where=is_admin.is_(True)),
+    )
 
     def __repr__(self):
         return (
@@ -1,7 +1,10 @@
 # routers/alerts.py
-from fastapi import APIRouter, Depends, Query
+import base64
+import hashlib
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from schemas.alert import AlertResponse, AlertSummary
 from schemas.part import PartResponse
@@ -14,21 +17,44 @@ router = APIRouter(
 )
 
 
+def _encode_cursor(cursor: tuple[datetime, int]) -> str:
+    """Encode a (created_at, id) keyset cursor as an opaque URL-safe string."""
+    created_at, alert_id = cursor
+    raw = f"{created_at.isoformat()}|{alert_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by _encode_cursor."""
+    try:
+        created_at, alert_id = base64.urlsafe_b64decode(
+            cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(alert_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/", response_model=List[AlertResponse])
 def read_alerts(
+    response: Response,
     active_only: bool = Query(
         True, description="Filter for only active alerts"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve a list of alerts from database.
     This is the primary endpoint for the Alerts UI page.
     """
-    alerts = alert_service.get_alerts(
-        db=db, skip=skip, limit=limit, active_only=active_only)
+    alerts, next_cursor = alert_service.get_alerts(
+        db=db, skip=skip, limit=limit, active_only=active_only,
+        cursor=_decode_cursor(cursor) if cursor else None)
 
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = _encode_cursor(next_cursor)
     return alerts
 
 
@@ -37,14 +63,22 @@ def get_low_stock_alerts(db: Session = Depends(get_db)):
     """"
     Get a list of all parts that are currently low on stock.
     """
-    low_stock_parts = alert_service.get_low_stock_parts(db)
+    low_stock_parts = alert_service.get_cached_low_stock_parts(db)
     return low_stock_parts
 
 
 @router.get("/summary", response_model=AlertSummary)
-def get_alert_summary(db: Session = Depends(get_db)):
+def get_alert_summary(request: Request, response: Response, db: Session = Depends(get_db)):
     """"
     Get alert summary statistics by called the alert service.
+    Polls with a matching If-None-Match get an empty 304 response.
     """
     summary = alert_service.get_alert_summary(db)
+
+    etag = '"%s"' % hashlib.blake2b(summary.model_dump_json().encode(),
+                                    digest_size=8).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
     return summary
@@ -11,7 +11,8 @@ import time
 from database import get_db
 from models.user import User
 from utils.dependencies import get_current_user
-from utils.security import verify_password, create_access_token, get_password_hash
+from utils.security import (averify_password, averify_and_update_password,
+                            create_access_token, get_password_hash)
 from schemas.token import Token
 from utils.logging_config import get_logger
 
@@ -41,22 +42,23 @@ async def login_for_access_token(
     user = db.query(User).filter(User.username == form_data.username).first()
 
     # Always perform password verification (even if user doesnot exist)
+    new_password_hash = None
     if user and user.hashed_password:
         try:
-            password_valid = verify_password(
+            password_valid, new_password_hash = await averify_and_update_password(
                 form_data.password, user.hashed_password)
             user_active = user.is_active
         except Exception as e:
-            logger.error(f"Password verification error for user {form_data.username}: {str(e)}")
+            logger.error("Password verification error for user %s: %s", form_data.username, e)
             password_valid = False
             user_active = False
 
     else:
         # Perform fake password check to normalize timing with proper dummy hash
         try: 
-            verify_password(form_data.password, DUMMY_HASH)
+            await averify_password(form_data.password, DUMMY_HASH)
         except Exception as e:
-            logger.error(f"Dummy password verification error for user {form_data.username}: {str(e)}")
+            logger.error("Dummy password verification error for user %s: %s", form_data.username, e)
             pass # Ignore errors on dummy check
         password_valid = False
         user_active = False
@@ -69,7 +71,7 @@ async def login_for_access_token(
     # Check authentication result
     if not user or not password_valid or not user_active:
         # Log failed authentication attempt (for security monitoring)
-        logger.warning(f"Failed login attempt for username: {form_data.username}")
+        logger.warning("Failed login attempt for username: %s", form_data.username)
 
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,10 +82,13 @@ async def login_for_access_token(
     try:
         # Update last login timestamp
         user.last_login = datetime.now(timezone.utc)
+        # Store the rehashed password if the old hash used a deprecated scheme
+        if new_password_hash:
+            user.hashed_password = new_password_hash
         db.commit()
         
         # Log successful login
-        logger.info(f"Successful login for user: {user.username}")
+        logger.info("Successful login for user: %s", user.username)
         
         # Create access token
         access_token = create_access_token(
@@ -99,7 +104,7 @@ async def login_for_access_token(
         
     except Exception as e:
         # Log database error but don't expose details
-        logger.error(f"Database error during login for user {user.username}: {str(e)}")
+        logger.error("Database error during login for user %s: %s", user.username, e)
         db.rollback()
         
         raise HTTPException(
@@ -112,13 +117,13 @@ async def login_for_access_token(
 async def verify_token_for_docs(current_user: User = Depends(get_current_user)):
     """Verify token for Nginx auth_request - admin only for docs access."""
     if not current_user.is_admin:
-        logger.warning(f"Non-admin user {current_user.username} attempted to access documentation")
+        logger.warning("Non-admin user %s attempted to access documentation", current_user.username)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access documentation"
         )
     
-    logger.info(f"Documentation access granted to admin user: {current_user.username}")
+    logger.info("Documentation access granted to admin user: %s", current_user.username)
     return {"status": "authorized", "user": current_user.username}
 
 
@@ -1,9 +1,10 @@
 # /routers/instruments.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Annotated
+from pydantic import TypeAdapter
 
 from database import get_db
 from models.instrument import Instrument
@@ -24,6 +25,9 @@ router = APIRouter(
 # Get a logger for this module
 logger = get_logger(__name__)
 
+# Built once at import so list responses skip FastAPI's per-request serializer
+InstrumentListAdapter = TypeAdapter(List[InstrumentResponse])
+
 # --- AUTHENTICATED ENDPOINTS ---
 # Create an instrument (required user to be logged in)
 
@@ -99,7 +103,11 @@ def delete_instrument(
 def get_all_instruments(db: Session = Depends(get_db)):
     """Get all active instruments."""
     instruments = db.query(Instrument).filter(Instrument.is_active).all()
-    return instruments
+    return Response(
+        content=InstrumentListAdapter.dump_json(
+            InstrumentListAdapter.validate_python(instruments, from_attributes=True)),
+        media_type="application/json"
+    )
 
 # Get a specific instrument by ID (publicly accessible)
 
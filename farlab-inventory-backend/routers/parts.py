@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status, Query
+from fastapi.exceptions import RequestValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import List, Annotated, Optional
+from pydantic import TypeAdapter, ValidationError
 
 from database import get_db
 from models.part import Part
@@ -10,12 +12,13 @@ from models.alert import Alert
 from models.instrument import Instrument
 from models.user import User
 from models.instrument_part import InstrumentPart
-from schemas.part import PartCreate, PartResponse, StockUpdate, PartUpdate
+from schemas.part import (PartCreate, PartResponse, StockUpdate, PartUpdate,
+                          PartInstrumentAssociation, BulkAssociateInstruments)
 from utils.dependencies import get_current_user, get_current_admin_user
 from utils.logging_config import get_logger
 from utils.config import settings
 from services import alert_service
-from services.notification_service import send_low_stock_email_notification
+from services.notification_service import queue_low_stock_email_notification, LowStockPart
 
 router = APIRouter(
     prefix="",
@@ -25,6 +28,40 @@ router = APIRouter(
 # Get a logger for this module
 logger = get_logger(__name__)
 
+# Built once at import so list responses skip FastAPI's per-request serializer
+PartListAdapter = TypeAdapter(List[PartResponse])
+# Validates a whole bulk association list in one pydantic-core call
+BulkAssociationsAdapter = TypeAdapter(List[PartInstrumentAssociation])
+
+
+def _inline_json_schema(model) -> dict:
+    """
+    Returns the model's JSON schema with its $defs references inlined, so it
+    can be placed directly in an operation's openapi_extra.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(value) for value in node]
+        return node
+
+    return resolve(schema)
+
+
+# The bulk endpoint reads a raw dict body, so its request schema is documented explicitly
+BULK_ASSOCIATE_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _inline_json_schema(BulkAssociateInstruments)}},
+    }
+}
+
 # --- AUTHENTICATED ENDPOINTS ---
 # # Create a part (requires user to be logged in)
 
@@ -44,24 +81,24 @@ def create_part(
     instrument_ids_to_process = []
 
     logger.info("=== CREATE PART DEBUG ===")
-    logger.info(f"Received part data: {part}")
+    logger.info("Received part data: %s", part)
     logger.info(
-        f"part.instrument_id: {getattr(part, 'instrument_id', 'NOT_SET')}")
+        "part.instrument_id: %s", getattr(part, 'instrument_id', 'NOT_SET'))
     logger.info(
-        f"part.instrument_ids: {getattr(part, 'instrument_ids', 'NOT_SET')}")
+        "part.instrument_ids: %s", getattr(part, 'instrument_ids', 'NOT_SET'))
 
     # Prioritize instrument_ids (multiple) over instrument_id (single)
     # New multiple instruments
     if part.instrument_ids and len(part.instrument_ids) > 0:
         instrument_ids_to_process = part.instrument_ids
-        logger.info(f"Using multiple instruments: {part.instrument_ids}")
+        logger.info("Using multiple instruments: %s", part.instrument_ids)
     elif part.instrument_id:  # Legacy single instrument
         instrument_ids_to_process = [part.instrument_id]
-        logger.info(f"Using single instrument: {part.instrument_id}")
+        logger.info("Using single instrument: %s", part.instrument_id)
     else:
         logger.info("No instruments specified")
 
-    logger.info(f"instrument_ids_to_process: {instrument_ids_to_process}")
+    logger.info("instrument_ids_to_process: %s", instrument_ids_to_process)
     logger.info("========================")
 
     try:
@@ -88,7 +125,7 @@ def create_part(
             # Create all associations
             for instrument_id in instrument_ids_to_process:
                 logger.info(
-                    f"Creating association: part_id={db_part.id}, instrument_id={instrument_id}")
+                    "Creating association: part_id=%s, instrument_id=%s", db_part.id, instrument_id)
                 db_relationship = InstrumentPart(
                     instrument_id=instrument_id,
                     part_id=db_part.id,
@@ -98,6 +135,8 @@ def create_part(
                 db.add(db_relationship)
 
         db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
         # Refresh the part again to load the new relationship into its 'instruments' list
         db.refresh(db_part)
         return db_part
@@ -132,7 +171,6 @@ def create_part(
 def update_part(
     part_id: int,
     part_update: PartUpdate,
-    background_tasks: BackgroundTasks,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_db)
 ):
@@ -150,6 +188,8 @@ def update_part(
         setattr(db_part, key, value)
 
     db.commit()
+    alert_service.invalidate_low_stock_cache()
+    alert_service.invalidate_alert_summary_cache()
     db.refresh(db_part)
 
     # If stock levels were changed, check for alerts
@@ -169,14 +209,103 @@ def update_part(
             logger.info(
                 "Part '%d' is low on stock after update. Checking for alert creation.", part_id)
 
-            alert_service.check_stock_and_create_alert(
-                db=db,
+            alert_service.check_stock_and_create_alert(db=db, part_id=part_id)
+
+    return db_part
+
+# Associate existing part with several instruments at once
+# Declared before "/{part_id}/instruments/{instrument_id}" so "bulk" is not parsed as an ID
+
+
+@router.post("/{part_id}/instruments/bulk", response_model=PartResponse,
+             openapi_extra=BULK_ASSOCIATE_OPENAPI)
+def bulk_associate_part_with_instruments(
+    part_id: int,
+    payload: Annotated[dict, Body(description="BulkAssociateInstruments payload")],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_db)
+):
+    """Associate an existing part with multiple instruments."""
+    # Strict list validation skips the coercion branches of the per-item model pipeline
+    try:
+        associations = BulkAssociationsAdapter.validate_python(
+            payload.get("associations"), strict=True)
+    except ValidationError as e:
+        # Same loc shape as the 422s FastAPI raises for declared body models
+        raise RequestValidationError([
+            {**error, "loc": ("body", "associations", *error["loc"])}
+            for error in e.errors()
+        ])
+
+    if not associations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one instrument association must be provided"
+        )
+
+    instrument_ids = [association.instrument_id for association in associations]
+    if len(set(instrument_ids)) != len(instrument_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each instrument can only be associated once"
+        )
+
+    db_part = db.query(Part).filter(Part.id == part_id).first()
+    if not db_part:
+        logger.warning("Part with ID %d not found for bulk association", part_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Part not found"
+        )
+
+    # Validate all instruments with a single query
+    found_ids = {row.id for row in db.query(Instrument.id).filter(
+        Instrument.id.in_(instrument_ids)).all()}
+    missing_ids = [i for i in instrument_ids if i not in found_ids]
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Instruments not found: {missing_ids}"
+        )
+
+    existing_ids = [row.instrument_id for row in db.query(InstrumentPart.instrument_id).filter(
+        InstrumentPart.part_id == part_id,
+        InstrumentPart.instrument_id.in_(instrument_ids)
+    ).all()]
+    if existing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Part '{db_part.name}' is already associated with instruments: {existing_ids}"
+        )
+
+    try:
+        db.add_all([
+            InstrumentPart(
+                instrument_id=association.instrument_id,
                 part_id=part_id,
-                background_tasks=background_tasks,
-                user_email=current_user.email
+                quantity_required=association.quantity_required,
+                is_critical=association.is_critical,
+                is_active=True
             )
+            for association in associations
+        ])
+        db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
+        db.refresh(db_part)  # Refresh to load the new relationships
 
-    return db_part
+        logger.info("Associated part %d with %d instruments",
+                    part_id, len(associations))
+        return db_part
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Database error while bulk associating part %d: %s",
+                     part_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected database error occured while creating the associations"
+        )
 
 # Associate existing part with an instrument
 
@@ -213,13 +342,13 @@ def associate_part_with_instrument(
             )
 
         # Check if association already exists
-        existing_association = db.query(InstrumentPart).filter(
+        association_exists = db.query(db.query(InstrumentPart).filter(
             and_(
                 InstrumentPart.part_id == part_id,
                 InstrumentPart.instrument_id == instrument_id
             )
-        ).first()
-        if existing_association:
+        ).exists()).scalar()
+        if association_exists:
             logger.info(
                 "Association between part %d and instrument %d already exists", part_id, instrument_id)
             raise HTTPException(
@@ -245,6 +374,8 @@ def associate_part_with_instrument(
 
         db.add(db_association)
         db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
         db.refresh(db_part)  # Refresh to load the new relationship
 
         logger.info(
@@ -331,6 +462,8 @@ def dissociate_part_from_instrument(
         db_association.is_active = False
 
         db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
 
         logger.info(
             "Successfully dissociated part %d (%s) from instrument %d (%s)",
@@ -439,6 +572,8 @@ def update_part_instrument_association(
             updates_made.append(f"is_critical: {old_critical} → {is_critical}")
 
         db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
         db.refresh(db_part)  # Refresh to load updated relationships
 
         logger.info(
@@ -493,6 +628,8 @@ def delete_part(
         # Then delete the part
         db.delete(db_part)
         db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
         return None
 
     except SQLAlchemyError as e:
@@ -510,7 +647,6 @@ def delete_part(
 def update_stock_level(
     part_id: int,
     stock_update: StockUpdate,
-    background_tasks: BackgroundTasks,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_db)
 ):
@@ -523,6 +659,7 @@ def update_stock_level(
     try:
         # Get state before update
         was_low_stock = db_part.is_low_stock
+        low_stock_email = None
 
         # Update stock
         db_part.update_stock(stock_update.quantity_change)
@@ -533,33 +670,27 @@ def update_stock_level(
             alert_service.resolve_alerts_for_part(db, part_id)
 
         elif db_part.is_low_stock:
-            # Check if alert already exists
-            existing_alert = db.query(Alert).filter(
-                Alert.part_id == part_id,
-                Alert.is_active.is_(True)
-            ).first()
-
-            if not existing_alert:
-                # Create new alert
-                new_alert = Alert.create_low_stock_alert(db_part)
-                db.add(new_alert)
-
-                # Queue email notification for background
-                background_tasks.add_task(
-                    send_low_stock_email_notification,
-                    part=db_part,
-                    admin_email=settings.ADMIN_EMAIL
-                )
+            # ON CONFLICT DO NOTHING on the one-active-alert-per-part index, so a
+            # concurrent stock update can't fail this one with a duplicate alert
+            if alert_service.insert_low_stock_alerts(db, [db_part]):
+                # Snapshot for the email, which is queued once the commit succeeds
+                low_stock_email = LowStockPart.from_part(db_part)
 
         # Commit everything atomically
         db.commit()
+        alert_service.invalidate_low_stock_cache()
+        alert_service.invalidate_alert_summary_cache()
         db.refresh(db_part)
 
+        if low_stock_email:
+            queue_low_stock_email_notification(
+                low_stock_email, settings.admin_emails)
+
         return db_part
 
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to update stock for part {part_id}: {e}")
+        logger.error("Failed to update stock for part %s: %s", part_id, e)
         raise HTTPException(
             status_code=500,
             detail="Failed to update stock"
@@ -592,7 +723,11 @@ def search_parts(
             Part.part_number.ilike(search_term)
         )
     ).all()
-    return parts
+    return Response(
+        content=PartListAdapter.dump_json(
+            PartListAdapter.validate_python(parts, from_attributes=True)),
+        media_type="application/json"
+    )
 
 # Get all active parts (publicly accessible)
 
@@ -610,7 +745,11 @@ def get_all_parts(
             InstrumentPart.instrument_id == instrument_id)
 
     parts = query.all()
-    return parts
+    return Response(
+        content=PartListAdapter.dump_json(
+            PartListAdapter.validate_python(parts, from_attributes=True)),
+        media_type="application/json"
+    )
 
 
 # Get a specific part by its ID (publicly accessible)
@@ -1,8 +1,10 @@
 # /users/ CRUD endpoints
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy import update, delete, select, func
 from sqlalchemy.exc import IntegrityError
 from typing import List, Annotated
+from pydantic import TypeAdapter
 
 from database import get_db
 from models.user import User
@@ -22,6 +24,9 @@ router = APIRouter(
 # Get a logger for this module
 logger = get_logger(__name__)
 
+# Built once at import so list responses skip FastAPI's per-request serializer
+UserListAdapter = TypeAdapter(List[UserResponse])
+
 # Note: User creation is a protected endpoint
 # In public app, get a separate, unprotected "signup" router
 
@@ -36,8 +41,12 @@ def create_user(
     db: Session = Depends(get_db)
 ):
     """Create a new user."""
-    existing_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
+    # Two index lookups on lower(username)/lower(email) instead of a BitmapOr
+    existing_user = db.execute(
+        select(User.id).where(func.lower(User.username) == user.username.lower())
+        .union_all(
+            select(User.id).where(func.lower(User.email) == user.email.lower()))
+        .limit(1)
     ).first()
     if existing_user:
         logger.warning(
@@ -95,13 +104,18 @@ def update_current_user_profile(
 ):
     """Update the profile of the currently logged-in user."""
     update_data = user_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
-
-    db.add(current_user)
+    if not update_data:
+        return current_user
+
+    # Single UPDATE ... RETURNING instead of per-attribute setattr and flush
+    updated_user = db.scalars(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(**update_data)
+        .returning(User)
+    ).one()
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    return updated_user
 
 # Get all users (admin only)
 
@@ -115,8 +129,12 @@ def get_all_users(
     db: Session = Depends(get_db)
 ):
     """Get a list of all users with limited pagination."""
-    users = db.query(User).offet(skip).limit(limit).all()
-    return users
+    users = db.query(User).offset(skip).limit(limit).all()
+    return Response(
+        content=UserListAdapter.dump_json(
+            UserListAdapter.validate_python(users, from_attributes=True)),
+        media_type="application/json"
+    )
 
 # Get a specific user by ID (admin only)
 
@@ -181,12 +199,14 @@ def delete_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Admins cannot delete their own account"
         )
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
+    # Single DELETE ... RETURNING instead of SELECT followed by ORM delete
+    deleted_id = db.execute(
+        delete(User).where(User.id == user_id).returning(User.id)
+    ).scalar_one_or_none()
+    if deleted_id is None:
         logger.warning("User with ID %d not found for deletion.", user_id)
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(db_user)
     logger.info("User with ID %d was deleted by admin %d.", user_id,
                 current_admin_user.id)
     db.commit()
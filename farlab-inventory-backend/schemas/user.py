@@ -1,14 +1,20 @@
-from pydantic import BaseModel, Field, EmailStr, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, AfterValidator, field_validator
+from typing import Optional, List, Annotated
 from datetime import datetime
 import re
 
+from utils.validators import validate_email_address
+
+# Email string checked against a precompiled pattern instead of email-validator.
+# Only used on input schemas, so stored addresses are returned as they are.
+EmailAddress = Annotated[str, AfterValidator(validate_email_address)]
+
 
 class UserBase(BaseModel):
     """Base schema for user data."""
     username: str = Field(..., min_length=3, max_length=50,
                           description="Unique username")
-    email: EmailStr = Field(..., description="User email address")
+    email: str = Field(..., description="User email address")
     first_name: str = Field(..., min_length=1,
                             max_length=50, description="First name")
     last_name: str = Field(..., min_length=1,
@@ -47,6 +53,7 @@ def validate_password_strength(password: str) -> List[str]:
 
 class UserCreate(UserBase):
     """Schema for creating a new user."""
+    email: EmailAddress = Field(..., description="User email address")
     password: str = Field(..., min_length=8,
                           description="User password")
 
@@ -60,7 +67,7 @@ class UserCreate(UserBase):
 
 class UserUpdate(BaseModel):
     """Schema for updating a user."""
-    email: Optional[EmailStr] = None
+    email: Optional[EmailAddress] = None
     first_name: Optional[str] = Field(None, min_length=1, max_length=50)
     last_name: Optional[str] = Field(None, min_length=1, max_length=50)
     phone: Optional[str] = Field(None, max_length=20)
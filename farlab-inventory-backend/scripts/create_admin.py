@@ -4,6 +4,7 @@ import os
 import sys
 from dotenv import load_dotenv, find_dotenv
 
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
@@ -39,8 +40,13 @@ def create_admin_user():
 
     try:
         # Check if the admin user or email already exists
-        existing_user = db.query(User).filter((User.username == settings.ADMIN_USERNAME) |
-                                              (User.email == settings.ADMIN_EMAIL)).first()
+        existing_user = db.execute(
+            select(User.id).where(
+                func.lower(User.username) == settings.ADMIN_USERNAME.lower())
+            .union_all(select(User.id).where(
+                func.lower(User.email) == settings.ADMIN_EMAIL.lower()))
+            .limit(1)
+        ).first()
         if existing_user:
             logger.warning("User with username '%s' or email '%s' already exists.",
                            settings.ADMIN_USERNAME, settings.ADMIN_EMAIL)
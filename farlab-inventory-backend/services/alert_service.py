@@ -1,12 +1,19 @@
 # Threshold checking and notification triggers
 # services/alert_service.py
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from fastapi import BackgroundTasks, Depends
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.orm import Session, selectinload, raiseload
+from sqlalchemy.dialects.postgresql import insert
+from fastapi import Depends
 
 from models.part import Part
+from models.instrument_part import InstrumentPart
 from schemas.alert import AlertSummary
-from services.notification_service import send_low_stock_email_notification
+from schemas.part import PartResponse
+from services.notification_service import queue_low_stock_email_notification, LowStockPart
 from utils.dependencies import get_db
 from utils.logging_config import get_logger
 from utils.config import settings
@@ -15,112 +22,245 @@ from models.alert import Alert
 # Get a logger for this module
 logger = get_logger(__name__)
 
+# Dashboard polls within this window are served from memory
+ALERT_SUMMARY_TTL_SECONDS = 30
+_alert_summary_cache: Optional[tuple[float, AlertSummary]] = None
+
+# The one definition of a part that needs restocking, shared by the alert
+# checks, the summary email and the dashboard list
+ACTIVE_LOW_STOCK = and_(Part.is_low_stock, Part.is_active.is_(True))
+
+# Low stock list served to the dashboard between stock changes
+LOW_STOCK_TTL_SECONDS = 60
+_low_stock_cache: Optional[tuple[float, list[PartResponse]]] = None
+
 
-def get_alerts(db: Session, skip: int, limit: int = 100, active_only: bool = True):
+def get_alerts(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True,
+               cursor: Optional[tuple[datetime, int]] = None) -> tuple[list[Alert], Optional[tuple[datetime, int]]]:
     """"
     Fetches alerts from database for UI.
     Can fetch only active alerts or all alerts.
+    Pass the returned (created_at, id) cursor to fetch the next page with an
+    index seek instead of an OFFSET scan. Returns (alerts, next_cursor).
     """
-    query = db.query(Alert)
+    # AlertResponse only reads alert columns, so any relationship access
+    # (e.g. alert.part) raises instead of lazily loading one row at a time
+    query = db.query(Alert).options(raiseload("*"))
     if active_only:
         query = query.filter(Alert.is_active.is_(True))
 
-    return query.order_by(Alert.created_at.desc()).populate_existing().offset(skip).limit(limit).all()
+    if cursor:
+        query = query.filter(tuple_(Alert.created_at, Alert.id) < cursor)
+    elif skip:
+        query = query.offset(skip)
 
+    alerts = query.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit).all()
 
-def check_stock_and_create_alert(db: Session, part_id: int, background_tasks: BackgroundTasks, user_email: str):
+    next_cursor = None
+    if alerts and len(alerts) == limit:
+        next_cursor = (alerts[-1].created_at, alerts[-1].id)
+    return alerts, next_cursor
+
+
+def check_stock_and_create_alert(db: Session, part_id: int):
     """"
     Checks the stock level of a part and sends an alert if it's low.
     This is to be called after a part's quantity is updated.
     """
-    # Fetch part directly from database
-    part = db.query(Part).filter(Part.id == part_id).first()
-
-    if not part or not part.is_low_stock:
-        return  # part doesnot exist or stock is fine, do nothing.
-
-    # Check if an active alert already exists for this part
-    existing_alert = db.query(Alert).filter(
-        Alert.part_id == part_id, Alert.is_active.is_(True)).first()
-    if existing_alert:
-        return  # An active alert exists so do nothing.
-
-    # If stock is low AND no active alert exists.
-    logger.info("Part '%s' is low on stock. Creating new alert.", part.name)
-
-    # Create the alert object and save it to the db
-    try:
-        new_alert = Alert.create_low_stock_alert(part)
-        db.add(new_alert)
-        db.commit()
-        logger.info(
-            "New alert for part '%s' created and committed to the database.", part.name)
-    except IntegrityError:
-        db.rollback()
-        logger.info(
-            "Active alert already exists for part '%s', skipping", part_id)
-
-    # Que the email to be sent in the background
-    background_tasks.add_task(
-        send_low_stock_email_notification,
-        part=part,
-        admin_email=settings.ADMIN_EMAIL
-    )
+    check_stock_and_create_alerts_bulk(db, [part_id])
+
+
+def check_stock_and_create_alerts_bulk(db: Session, part_ids: list[int]) -> list[LowStockPart]:
+    """"
+    Checks the stock level of several parts and creates alerts for the low ones.
+    Uses a fixed number of queries regardless of how many parts are passed.
+    Parts that already have an active alert are skipped by the database.
+    Returns snapshots of the parts for which a new alert was created.
+    """
+    if not part_ids:
+        return []
+
+    # The low stock check runs in SQL, so parts with enough stock are never
+    # loaded. Instruments used in the alert message come in one extra query.
+    low_stock_parts = db.query(Part).options(
+        selectinload(Part.instrument_parts).selectinload(InstrumentPart.instrument)
+    ).filter(Part.id.in_(part_ids), Part.is_low_stock).all()
+    if not low_stock_parts:
+        return []  # parts don't exist or stock is fine, do nothing.
+
+    # Lightweight snapshots for the email task, which runs after the session closes
+    parts_by_id = {part.id: LowStockPart.from_part(part) for part in low_stock_parts}
+    created_ids = insert_low_stock_alerts(db, low_stock_parts)
+    db.commit()
+
+    new_alert_parts = [parts_by_id[part_id] for part_id in created_ids]
+    if not new_alert_parts:
+        return []  # An active alert exists for every part so do nothing.
+
+    logger.info("New alerts for %d low stock part(s) created and committed to the database.",
+                len(new_alert_parts))
+
+    # Que the emails for the notification worker
+    for part in new_alert_parts:
+        queue_low_stock_email_notification(part, settings.admin_emails)
+
+    return new_alert_parts
+
+
+def insert_low_stock_alerts(db: Session, parts: list[Part]) -> list[int]:
+    """"
+    Inserts low stock alerts for the given parts in one statement.
+    The partial unique index on active alerts makes the database skip parts
+    that already have one. Returns the IDs of parts that got a new alert.
+    The caller is responsible for committing.
+    """
+    if not parts:
+        return []
+    stmt = insert(Alert).values(
+        [Alert.low_stock_alert_values(part) for part in parts]
+    ).on_conflict_do_nothing(
+        index_elements=[Alert.part_id],
+        index_where=Alert.is_active.is_(True)
+    ).returning(Alert.part_id)
+    created_ids = db.execute(stmt).scalars().all()
+    if created_ids:
+        invalidate_alert_summary_cache()
+    return created_ids
 
 
 def get_low_stock_parts(db: Session) -> list[Part]:
     """"
-    Returns a list of all parts that are currently low on stock.
+    Returns a list of all active parts that are currently low on stock, with their
+    instruments loaded by one extra query.
+    """
+    return db.query(Part).options(
+        selectinload(Part.instrument_parts).selectinload(InstrumentPart.instrument)
+    ).filter(ACTIVE_LOW_STOCK).all()
+
+
+def get_low_stock_part_rows(db: Session) -> tuple[list[LowStockPart], list[int]]:
+    """"
+    Returns the active parts that are low on stock as lightweight rows with
+    only the columns used by the summary email, and the IDs of those parts
+    that have no active alert yet. One query outer-joins the active alert
+    (at most one per part), no ORM objects are built.
     """
-    return db.query(Part).filter(Part.quantity_in_stock <= Part.minimum_stock_level).all()
+    rows = db.query(
+        Part.id, Part.name, Part.part_number,
+        Part.quantity_in_stock, Part.minimum_stock_level,
+        Alert.id.isnot(None).label("has_alert")
+    ).outerjoin(
+        Alert, and_(Alert.part_id == Part.id, Alert.is_active.is_(True))
+    ).filter(ACTIVE_LOW_STOCK).all()
+    low_stock_rows = [LowStockPart(*row[:-1]) for row in rows]
+    ids_without_alert = [row.id for row in rows if not row.has_alert]
+    return low_stock_rows, ids_without_alert
+
+
+def get_parts_for_alerts(db: Session, part_ids: list[int]) -> list[Part]:
+    """"
+    Returns the given parts with the instruments used in the alert message
+    loaded by one extra query.
+    """
+    if not part_ids:
+        return []
+    return db.query(Part).options(
+        selectinload(Part.instrument_parts).selectinload(InstrumentPart.instrument)
+    ).filter(Part.id.in_(part_ids)).all()
+
+
+def get_cached_low_stock_parts(db: Session) -> list[PartResponse]:
+    """"
+    Returns the low stock parts as response models, cached for
+    LOW_STOCK_TTL_SECONDS. The cache holds plain models rather than ORM
+    objects so it is safe to share across sessions.
+    Part changes call invalidate_low_stock_cache().
+    """
+    global _low_stock_cache
+
+    now = time.monotonic()
+    if _low_stock_cache and now - _low_stock_cache[0] < LOW_STOCK_TTL_SECONDS:
+        return _low_stock_cache[1]
+
+    low_stock_parts = [PartResponse.model_validate(part) for part in get_low_stock_parts(db)]
+    _low_stock_cache = (now, low_stock_parts)
+    return low_stock_parts
+
+
+def invalidate_low_stock_cache():
+    """"
+    Drops the cached low stock list so the next read queries the database.
+    """
+    global _low_stock_cache
+    _low_stock_cache = None
+
+
+def invalidate_alert_summary_cache():
+    """"
+    Drops the cached alert summary so the next read queries the database.
+    Call whenever alerts are created or resolved or stock changes.
+    """
+    global _alert_summary_cache
+    _alert_summary_cache = None
 
 
 def get_alert_summary(db: Session = Depends(get_db)):
     """"
     Get a summary of the current alert status, including counts for low
     stock and out of stock parts.
+    Results are cached for ALERT_SUMMARY_TTL_SECONDS.
+    Alert and stock changes call invalidate_alert_summary_cache().
     """
-    total_alerts = db.query(Alert).count()
-    active_alerts = db.query(Alert).filter(Alert.is_active.is_(True)).count()
-    resolved_alerts = db.query(Alert).filter(
-        Alert.is_resolved.is_(True)).count()
-
-    # Count parts that are out of stock
-    out_of_stock_parts = db.query(Part).filter(
-        Part.quantity_in_stock == 0,
-        Part.is_active.is_(True)
-    ).count()
-
-    # Count critical parts that are low on stock BUT not out of stock
-    critical_parts_low = db.query(Part).filter(
-        Part.is_critical.is_(True),
-        Part.quantity_in_stock <= Part.minimum_stock_level,
-        Part.quantity_in_stock > 0,
-        Part.is_active.is_(True)
-    ).count()
-
-    return AlertSummary(
+    global _alert_summary_cache
+
+    now = time.monotonic()
+    if _alert_summary_cache and now - _alert_summary_cache[0] < ALERT_SUMMARY_TTL_SECONDS:
+        return _alert_summary_cache[1]
+
+    # One conditional aggregation per table (COUNT(*) FILTER (WHERE ...))
+    total_alerts, active_alerts, resolved_alerts = db.query(
+        func.count(Alert.id),
+        func.count(Alert.id).filter(Alert.is_active.is_(True)),
+        func.count(Alert.id).filter(Alert.is_resolved.is_(True))
+    ).one()
+
+    out_of_stock_parts, critical_parts_low = db.query(
+        # Parts that are out of stock
+        func.count(Part.id).filter(Part.quantity_in_stock == 0),
+        # Critical parts that are low on stock BUT not out of stock
+        func.count(Part.id).filter(
+            Part.is_critical.is_(True),
+            Part.quantity_in_stock <= Part.minimum_stock_level,
+            Part.quantity_in_stock > 0
+        )
+    ).filter(Part.is_active.is_(True)).one()
+
+    summary = AlertSummary(
         total_alerts=total_alerts,
         active_alerts=active_alerts,
         resolved_alerts=resolved_alerts,
         critical_parts_low=critical_parts_low,
         out_of_stock_parts=out_of_stock_parts
     )
+    _alert_summary_cache = (now, summary)
+    return summary
 
 
 def resolve_alerts_for_part(db: Session, part_id: int):
     """"
-    Finds and resolves all active alerts for a specific part.
+    Resolves all active alerts for a specific part in one UPDATE.
     This should be called when stock is replenished.
     """
-    alerts_to_resolve = db.query(Alert).filter(
-        Alert.part_id == part_id, Alert.is_active.is_(True)).all()
-    if not alerts_to_resolve:
-        return
-
-    logger.info("Stock replenished for part ID %d. Resolving %d active alert(s).",
-                part_id, len(alerts_to_resolve))
-    for alert in alerts_to_resolve:
-        alert.resolve()
-
+    resolved_count = db.query(Alert).filter(
+        Alert.part_id == part_id, Alert.is_active.is_(True)
+    ).update({
+        Alert.is_active: False,
+        Alert.is_resolved: True,
+        Alert.resolved_at: func.now()
+    }, synchronize_session=False)
     db.commit()
+    invalidate_alert_summary_cache()
+
+    if resolved_count:
+        logger.info("Stock replenished for part ID %d. Resolved %d active alert(s).",
+                    part_id, resolved_count)
@@ -1,118 +1,228 @@
 # services/notification_service.py
+import atexit
+import io
+import queue
 import smtplib
-import html
+import threading
 import email
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import Callable, List, Dict, NamedTuple, Optional
+from datetime import datetime
 import time 
-import re 
-from dataclasses import dataclass
+
+from jinja2 import Environment
 
 from models.part import Part
 from utils.logging_config import get_logger
 from utils.config import settings
+from utils.retry import retry_with_backoff
+from utils.validators import EMAIL_RE
 
 # Get a logger for this module
 logger = get_logger(__name__)
 
+# Settings don't change after boot, so the SMTP configuration is checked once
+_MISSING_SMTP_SETTINGS = [
+    name for name in ("SMTP_HOST", "SMTP_PORT", "SMTP_USER", "SMTP_PASSWORD", "SENDER_EMAIL")
+    if not getattr(settings, name)
+]
+
+
+class LowStockPart(NamedTuple):
+    """Detached snapshot of the part fields used in low stock emails."""
+    id: int
+    name: str
+    part_number: str
+    quantity_in_stock: int
+    minimum_stock_level: int
 
-@dataclass
-class EmailRateLimit:
-    """Track email sending rate limits."""
-    last_sent: Dict[str, datetime] = None
-    send_count: Dict[str, int] = None
+    @classmethod
+    def from_part(cls, part: Part) -> "LowStockPart":
+        return cls(part.id, part.name, part.part_number,
+                   part.quantity_in_stock, part.minimum_stock_level)
 
-    def __post_init__(self):
-        if self.last_sent is None:
-            self.last_sent = {}
-        if self.send_count is None:
-            self.send_count = {}
 
-# Global rate limiter (use Redis in production?)
-email_limiter = EmailRateLimit()
+class SMTPPool:
+    """
+    Keeps one authenticated SMTP connection per thread and reuses it across
+    emails instead of doing connect + STARTTLS + login for every message.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[smtplib.SMTP] = []
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30)
+        server.starttls()
+        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        with self._lock:
+            self._connections.append(server)
+        logger.debug("Opened new SMTP connection to %s", settings.SMTP_HOST)
+        return server
+
+    def _close(self, server: smtplib.SMTP):
+        with self._lock:
+            if server in self._connections:
+                self._connections.remove(server)
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def get_connection(self) -> smtplib.SMTP:
+        """Return this thread's connection, reconnecting if it fails a NOOP check."""
+        server = getattr(self._local, "server", None)
+        if server is not None:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(server)
+
+        self._local.server = self._connect()
+        return self._local.server
+
+    def reset(self):
+        """Drop this thread's connection so the next call reconnects."""
+        server = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is not None:
+            self._close(server)
+
+    def close_all(self):
+        """Close every pooled connection (called on shutdown)."""
+        with self._lock:
+            connections = list(self._connections)
+        for server in connections:
+            self._close(server)
+
+
+# Email bodies, compiled once at import. Autoescape keeps part data from injecting HTML.
+_TEMPLATE_ENV = Environment(autoescape=True)
+
+_LOW_STOCK_TMPL = _TEMPLATE_ENV.from_string("""
+    <p> This is an automated alert to inform you that a part in the inventory is running low on stock.</p>
+
+    <h2>Part Details:</h2>
+    <ul>
+        <li><strong>Part Name:</strong>{{ part.name }}</li>
+        <li><strong>Part Number:</strong>{{ part.part_number }}</li>
+        <li><strong>Current Quantity:</strong>{{ part.quantity_in_stock }}</li>
+        <li><strong>Minimum Stock Level:</strong>{{ part.minimum_stock_level }}</li>
+    </ul>
+    <p><small>This is an automated message from FARLAB Inventory System at {{ timestamp }}</small></p>
+""")
+
+_SUMMARY_TMPL = _TEMPLATE_ENV.from_string("""
+        <p>This is your daily summary of inventory items that are low on stock.</p>
+        <h2>Active Low Stock Alerts:</h2>
+        <ul>
+            {% for part in parts %}<li><strong>{{ part.name }}</strong> (Part #{{ part.part_number }}) - In Stock: {{ part.quantity_in_stock }}, Minimum Threshold: {{ part.minimum_stock_level }}</li>{% endfor %}
+        </ul>
+        <p>Please review the inventory and take the necessary action.</p>
+        """)
+
+# Shared SMTP connection pool
+smtp_pool = SMTPPool()
+atexit.register(smtp_pool.close_all)
+
+# Bounded queue of pending notifications, drained by a single worker thread
+# so request threads never wait on SMTP
+notification_queue: "queue.Queue[tuple[Optional[Callable], tuple]]" = queue.Queue(maxsize=1024)
+_notification_worker: Optional[threading.Thread] = None
+
+
+# Per-key fixed one-hour windows: key -> (window start, emails sent).
+# Expired windows are pruned on every check, so memory is bounded by the
+# keys that sent an email within the last hour.
+# The counters live in this process and are not shared between uvicorn
+# workers (UVICORN_WORKERS=2 in docker-compose.yml). A limit of N per hour
+# is therefore N per hour per worker.
+RATE_LIMIT_WINDOW_SECONDS = 3600
+_rate_limit_windows: Dict[str, tuple[float, int]] = {}
+_rate_limit_lock = threading.Lock()
 
-def esccape_html_content(content: str) -> str:
-    """Safely escape HTML content to prevent injection."""
-    if not content:
-        return ""
-    return html.escape(str(content))
 
 def check_email_rate_limit(email_key: str, max_per_hour: int = 10) -> bool:
-    """Check if email sending is within rate limits."""
-    now = datetime.now()
-    hour_ago = now - timedelta(hours=1)
+    """"
+    Check if email sending is within rate limits and count this send.
+    The limit applies per worker process, see RATE_LIMIT_WINDOW_SECONDS.
+    """
+    now = time.monotonic()
+    with _rate_limit_lock:
+        expired = [key for key, (window_start, _count) in _rate_limit_windows.items()
+                   if now - window_start >= RATE_LIMIT_WINDOW_SECONDS]
+        for key in expired:
+            del _rate_limit_windows[key]
 
-    # Reset counter if hour passed
-    if email_key not in email_limiter.last_sent or email_limiter.last_sent[email_key] < hour_ago:
-        email_limiter.send_count[email_key] = 0
-    
-    # Check if under limit
-    current_count = email_limiter.send_count.get(email_key, 0)
-    if current_count >= max_per_hour:
-        logger.warning("Email rate limit exceeded for key: %s", email_key)
-        return False
-    
-    # Update counters
-    email_limiter.last_sent[email_key] = now 
-    email_limiter.send_count[email_key] = current_count + 1
+        window_start, current_count = _rate_limit_windows.get(email_key, (now, 0))
+        if current_count >= max_per_hour:
+            logger.warning("Email rate limit exceeded for key: %s", email_key)
+            return False
 
+        _rate_limit_windows[email_key] = (window_start, current_count + 1)
+        return True
 
 
-def _send_email(to_email: str, subject: str, body_html: str):
+def _send_email(to_emails: List[str], subject: str, body_html: str,
+                delivered: Optional[set] = None):
     """"
     Handles the connection to the SMTP server and sends the email.
+    One pooled connection is reused for every recipient.
+    Recipients already in delivered are skipped and each successful send is
+    added to it, so a retry after a partial failure only sends to the rest.
     This is a private helper function for this module.
     """
+    if delivered is None:
+        delivered = set()
     # Validate email address format
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, to_email):
-        raise ValueError(f"Invalid email address: {to_email}")
+    for to_email in to_emails:
+        if '@' not in to_email or not EMAIL_RE.match(to_email):
+            raise ValueError(f"Invalid email address: {to_email}")
 
     # Ensure all required environment variables are set
-    missing_settings = []
-    required_settings = {
-        "SMTP_HOST": settings.SMTP_HOST,
-        "SMTP_PORT": settings.SMTP_PORT,
-        "SMTP_USER": settings.SMTP_USER,
-        "SMTP_PASSWORD": settings.SMTP_PASSWORD,
-        "SENDER_EMAIL": settings.SENDER_EMAIL
-    }
-    for name, value in required_settings.items():
-        if not value:
-            missing_settings.append(name)
-    
-    if missing_settings:
-        raise ValueError(f"Missing SMTP configuration: {', '.join(missing_settings)}")
+    if _MISSING_SMTP_SETTINGS:
+        raise ValueError(f"Missing SMTP configuration: {', '.join(_MISSING_SMTP_SETTINGS)}")
 
     try:
         # Create the email message object
         msg = MIMEMultipart()
         msg["From"] = settings.SENDER_EMAIL
-        msg["To"] = to_email
         msg["Subject"] = subject
         msg["Date"] = email.utils.formatdate(localtime=True)
         msg["Message-ID"] = email.utils.make_msgid()
 
         msg.attach(MIMEText(body_html, "html"))
 
-        # Connect to the SMTP server and send the email
-        # The with statement ensure automatic connection close
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-            
-        logger.info("Email sent successfully to %s", to_email)
+        # Send over the pooled connection, one message per recipient
+        server = smtp_pool.get_connection()
+        for to_email in to_emails:
+            if to_email in delivered:
+                continue
+            del msg["To"]
+            msg["To"] = to_email
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Dropped between the health check and the send, reconnect once
+                smtp_pool.reset()
+                server = smtp_pool.get_connection()
+                server.send_message(msg)
+            delivered.add(to_email)
+
+        logger.info("Email sent successfully to %s", ", ".join(to_emails))
 
     except Exception as e:
         logger.error("Failed to send email to %s. Reason: %s",
-                     to_email, e, exc_info=True)
+                     ", ".join(to_emails), e, exc_info=True)
         raise 
 
 
-def send_low_stock_email_notification(part: Part, admin_email: str):
+def send_low_stock_email_notification(part: LowStockPart, admin_emails: List[str]):
     """"
     Sends an email notification for low stock with security and rate limiting.
     """
@@ -122,64 +232,90 @@ def send_low_stock_email_notification(part: Part, admin_email: str):
         logger.warning("Rate limit hit for part %s notifications", part.name)
         return
     
-    # Safely escape all dynamic content
-    safe_name = esccape_html_content(part.name)
-    safe_part_number = esccape_html_content(part.part_number)
-    safe_quantity = esccape_html_content(str(part.quantity_in_stock))
-    safe_minimum = esccape_html_content(str(part.minimum_stock_level))
-
     # Notification email subject
     subject = f"Lows Stock Alert: {part.name}"
 
-    # Safe notification email with escaped content
-    body = f"""
-    <p> This is an automated alert to inform you that a part in the inventory is running low on stock.</p>
+    # Notification email with escaped content
+    body = _LOW_STOCK_TMPL.render(
+        part=part, timestamp=datetime.now().strftime('%Y-%m-%d %H-%M-%S'))
 
-    <h2>Part Details:</h2>
-    <ul>
-        <li><strong>Part Name:</strong>{safe_name}</li>
-        <li><strong>Part Number:</strong>{safe_part_number}</li>
-        <li><strong>Current Quantity:</strong>{safe_quantity}</li>
-        <li><strong>Minimum Stock Level:</strong>{safe_minimum}</li>
-    </ul>
-    <p><small>This is an automated message from FARLAB Inventory System at {datetime.now().strftime('%Y-%m-%d %H-%M-%S')}</small></p>
-"""
-
-    # Send email to the admin
-    logger.info("Sending low stock notification for '%s' to '%s' and '%s'",
-                part.name, admin_email)
+    # Send email to the admins
+    logger.info("Sending low stock notification for '%s' to '%s'",
+                part.name, ", ".join(admin_emails))
 
-    # _send_email(admin_email, subject, body)
     # Send with retry logic
-    send_email_with_retry(admin_email, subject, body)
+    send_email_with_retry(admin_emails, subject, body)
 
-def send_email_with_retry(to_email: str, subject: str, body: str, max_retries: int = 3):
-    """Send email with retry logic and better error handling."""
-    for attempt in range(max_retries):
+def queue_low_stock_email_notification(part: LowStockPart, admin_emails: List[str]) -> bool:
+    """
+    Queue a low stock email for the notification worker.
+    Returns False if the queue is full and the email was dropped.
+    """
+    try:
+        notification_queue.put_nowait(
+            (send_low_stock_email_notification, (part, admin_emails)))
+        return True
+    except queue.Full:
+        logger.warning(
+            "Notification queue full, dropping low stock email for part %s", part.name)
+        return False
+
+
+def _notification_worker_loop():
+    """Send queued notifications one by one over the pooled SMTP connection."""
+    while True:
+        func, args = notification_queue.get()
         try:
-            _send_email(to_email, subject, body)
-            return  # Success
-        except smtplib.SMTPAuthenticationError as e:
-            logger.error("SMTP authentication failed: %s", e)
-            break  # Don't retry auth failures
-        except smtplib.SMTPServerDisconnected as e:
-            if attempt == max_retries - 1:
-                logger.error("SMTP server disconnected after %d attempts: %s", max_retries, e)
-                raise
-            logger.warning("SMTP disconnected, retrying attempt %d: %s", attempt + 1, e)
-            time.sleep(2 ** attempt)  # Exponential backoff
+            if func is None:  # Shutdown sentinel
+                return
+            func(*args)
         except Exception as e:
-            if attempt == max_retries - 1:
-                logger.error("Email sending failed after %d attempts: %s", max_retries, e)
-                raise
-            logger.warning("Email attempt %d failed, retrying: %s", attempt + 1, e)
-            time.sleep(2 ** attempt)
+            logger.error("Queued notification failed: %s", e, exc_info=True)
+        finally:
+            notification_queue.task_done()
+
+
+def start_notification_worker():
+    """Start the notification worker thread if it is not already running."""
+    global _notification_worker
+    if _notification_worker and _notification_worker.is_alive():
+        return
+    _notification_worker = threading.Thread(
+        target=_notification_worker_loop, name="notification-worker", daemon=True)
+    _notification_worker.start()
+    logger.info("Notification worker started")
+
+
+def stop_notification_worker(timeout: float = 30):
+    """Let the worker finish queued notifications and stop it."""
+    if _notification_worker and _notification_worker.is_alive():
+        notification_queue.put((None, ()), timeout=timeout)
+        _notification_worker.join(timeout)
+        logger.info("Notification worker stopped")
+
+
+def send_email_with_retry(to_emails: List[str], subject: str, body: str, max_retries: int = 3):
+    """Send email with retry logic and better error handling."""
+    try:
+        # Shared across attempts so recipients already served aren't emailed twice
+        delivered = set()
+        # Don't retry auth failures, or the ValueErrors raised for missing
+        # SMTP settings and invalid addresses: another attempt can't fix them
+        retry_with_backoff(_send_email, to_emails, subject, body, delivered,
+                           max_retries=max_retries,
+                           no_retry=(smtplib.SMTPAuthenticationError, ValueError))
+    except smtplib.SMTPAuthenticationError as e:
+        logger.error("SMTP authentication failed: %s", e)
+    except ValueError as e:
+        logger.error("Email not sent: %s", e)
 
 
-def send_periodic_alert_summary(alerts: List[Part], admin_email: str):
+def send_periodic_alert_summary(alerts: List[LowStockPart], admin_emails: List[str],
+                                delivered: Optional[set] = None):
     """"
     Sends a summary email of all parts that are currently low on stock.
-    This is the function for the scheduled task.
+    This is the function for the scheduled task. Pass the same delivered set
+    to every retry so admins already served aren't emailed again.
     """
     if not alerts:
         logger.info("Scheduler: No active alerts to send in the summary email.")
@@ -187,21 +323,11 @@ def send_periodic_alert_summary(alerts: List[Part], admin_email: str):
 
     subject = "Daily Inventory Alert Summary"
 
-    # Create an html list of the parts that are low in stock
-    parts_list_html = "".join([
-        f"<li><strong>{part.name}</strong> (Part #{part.part_number}) - "
-        f"In Stock: {part.quantity_in_stock}, "
-        f"Minimum Threshold: {part.minimum_stock_level}</li>"
-        for part in alerts
-    ])
-
-    body = f"""
-        <p>This is your daily summary of inventory items that are low on stock.</p>
-        <h2>Active Low Stock Alerts:</h2>
-        <ul>
-            {parts_list_html}
-        </ul>
-        <p>Please review the inventory and take the necessary action.</p>
-        """
+    # Html list of the parts that are low in stock, escaped by the template.
+    # Chunks are written out as they are generated instead of being
+    # collected into a list and joined, so each row is freed once written.
+    buf = io.StringIO()
+    for chunk in _SUMMARY_TMPL.generate(parts=alerts):
+        buf.write(chunk)
 
-    _send_email(admin_email, subject, body)
+    _send_email(admin_emails, subject, buf.getvalue(), delivered)
@@ -1,20 +1,21 @@
 # services/scheduler.py
-from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.orm import Session
 from database import get_background_db_session
-from services.notification_service import send_periodic_alert_summary
-from services.alert_service import get_low_stock_parts
+from services.notification_service import (send_periodic_alert_summary, smtp_pool,
+                                           start_notification_worker, stop_notification_worker)
+from services.alert_service import (get_low_stock_part_rows, get_parts_for_alerts,
+                                    insert_low_stock_alerts, invalidate_low_stock_cache,
+                                    invalidate_alert_summary_cache)
 from utils.logging_config import get_logger
 from utils.config import settings
+from utils.retry import retry_with_backoff
 
-import atexit
-import time 
-from datetime import datetime
-from threading import Event
+import asyncio
+import smtplib
+from typing import Callable, Optional
 
-# Global scheduler instance for proper shutdown
-scheduler_instance = None
-shutdown_event = Event()
+# Alert loop task on the application's event loop, kept for proper shutdown
+_alert_task: Optional[asyncio.Task] = None
+_shutdown_event: Optional[asyncio.Event] = None
 
 # Get a logger for this module
 logger = get_logger(__name__)
@@ -30,124 +31,90 @@ def scheduled_alert_job():
     # Use the background database session context manager
     with get_background_db_session() as db:
         try:
-            # 1. Fetch all currently low on stock parts from db
-            low_stock_parts = get_low_stock_parts(db)
-
-            # 2. Send the summary email if there are any alerts
-            if low_stock_parts:
+            # 1. Fetch the columns of all currently low on stock parts for the summary,
+            # flagged by whether they have an active alert. Always from the
+            # database, and the dashboard cache is refreshed with it
+            summary_parts, ids_without_alert = get_low_stock_part_rows(db)
+            invalidate_low_stock_cache()
+            invalidate_alert_summary_cache()
+
+            # 2. Create alerts for low stock parts that don't have one yet. Only
+            # those parts are loaded in full, for the alert message
+            if ids_without_alert:
+                parts_without_alert = get_parts_for_alerts(db, ids_without_alert)
+                created_ids = insert_low_stock_alerts(db, parts_without_alert)
+                db.commit()
+                logger.info("Created %d missing low-stock alert(s).", len(created_ids))
+
+            # 3. Send the summary email if there are any alerts
+            if summary_parts:
                 logger.info(
-                    "Found '%d' low-stock parts. Sending summary email.", len(low_stock_parts))
-                send_periodic_alert_summary(low_stock_parts, settings.ADMIN_EMAIL)
+                    "Found '%d' low-stock parts. Sending summary email.", len(summary_parts))
+                # Shared across attempts so admins already served aren't emailed twice
+                delivered = set()
+                # Don't retry auth failures or configuration/address errors
+                retry_with_backoff(send_periodic_alert_summary,
+                                   summary_parts, settings.admin_emails, delivered,
+                                   max_retries=3,
+                                   no_retry=(smtplib.SMTPAuthenticationError, ValueError))
             else:
                 logger.info("No low stock parts found. No summary email needed.")
         except Exception as e:
             logger.error("Error in scheduled alert job: %s", e, exc_info=True)
 
 
-def start_scheduler():
+async def _alert_loop(job: Callable[[], None], interval_seconds: float):
     """"
-    Initializes and starts the background scheduler with proper lifecycle.
+    Runs the job every interval until shutdown is requested. The blocking
+    job runs in the default thread pool so the event loop stays responsive.
+    Runs never overlap because each one is awaited before the next wait.
     """
-    global scheduler_instance
-
-    # scheduler = BackgroundScheduler(daemon=True)
-    scheduler_instance = BackgroundScheduler(
-        daemon=False, # Allow proper cleanup
-        job_defaults={
-            'coalesce': True, # Prevent job pile-up
-            'max_instances': 1, # Only one instance at a time
-            'misfire_grace_time': 300 # 5-minute grace period
-        }
-    )
-
-    # Schedule the job to run every day at 9:00 AM
-    # The 'cron' trigger is powerful for setting specific times.
-    # scheduler.add_job(scheduled_alert_job, 'cron', hour=9, minute=0)
-
-    # For testing purposes, one can uncomment the line below
-    # This will run the job every 60 minute default, which is useful for development
-    scheduler_instance.add_job(
-        func=scheduled_alert_job, # Wrapped with error handling
-        trigger='interval',
-        minutes=settings.SCHEDULER_INTERVAL_MINUTES,
-        id="alert_summary_job", # Give job an ID for monitoring
-        replace_existing=True # Handle restarts gracefully
-    )
-
-    scheduler_instance.start()
-
-    # Register cleanup function
-    atexit.register(shutdown_scheduler)
-    logger.info(
-        "Background scheduler started safely with job ID: alert_summary_job")
-
-def shutdown_scheduler():
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            # Returns early when shutdown is requested
+            await asyncio.wait_for(_shutdown_event.wait(), timeout=interval_seconds)
+            return
+        except asyncio.TimeoutError:
+            pass
+        await loop.run_in_executor(None, job)
+
+
+def start_scheduler(job: Callable[[], None] = scheduled_alert_job):
+    """"
+    Starts the alert job as a task on the running event loop.
+    The job defaults to scheduled_alert_job; main passes its monitored wrapper.
+    Must be called from the application's lifespan.
+    """
+    global _alert_task, _shutdown_event
+
+    _shutdown_event = asyncio.Event()
+    _alert_task = asyncio.get_running_loop().create_task(
+        _alert_loop(job, settings.SCHEDULER_INTERVAL_MINUTES * 60),
+        name="alert_summary_job")
+
+    # Worker thread that sends queued notification emails
+    start_notification_worker()
+
+    logger.info("Alert scheduler started with job: alert_summary_job")
+
+
+def is_running() -> bool:
+    """Whether the alert loop task is alive."""
+    return _alert_task is not None and not _alert_task.done()
+
+
+async def shutdown_scheduler():
     """Gracefully shutdown the scheduler."""
-    global scheduler_instance
-    if scheduler_instance and scheduler_instance.running:
+    global _alert_task
+    if is_running():
         logger.info("Shutting down scheduler ...")
-        scheduler_instance.shutdown(wait=True) # Wait for current job to finish
+        _shutdown_event.set()
+        await _alert_task  # Wait for current job to finish
         logger.info("Scheduler shut down gracefully")
-
-def safe_scheduler_alert_job():
-    """Enhanced job wrapper with better error handling."""
-    job_start_time = time.time()
-    logger.info("Starting scheduled alert job at %s", datetime.now())
-
-    try: 
-        # Use the background database session context manager
-        with get_background_db_session() as db:
-            # Check if we should run (avoid duplicate notifications)
-            if should_send_daily_summary(db):
-                low_stock_parts = get_low_stock_parts(db)
-
-                if low_stock_parts:
-                    logger.info("Found %d low-stock parts. Sending summary email.", len(low_stock_parts))
-
-                    # Send notification with retry logic
-                    send_with_retry(
-                        send_periodic_alert_summary,
-                        low_stock_parts,
-                        settings.ADMIN_EMAIL,
-                        max_retries=3
-                    )
-
-                    # Mark summary as sent
-                    mark_summary_sent(db)
-                else:
-                    logger.info("No low stock parts found.")
-            else:
-                logger.info("Daily summary already sent today, skipping.")
-    
-    except Exception as e:
-        logger.error("Critical error in scheduled job: %s", e, exc_info=True)
-        # TODO: Send alert about scheduler failure
-    
-    finally:
-        job_duration = time.time() - job_start_time
-        logger.info("Scheduled job completed in %.2f seconds", job_duration)
-
-def should_send_daily_summary(db: Session) -> bool:
-    """Check if daily summary was already sent today."""
-    # TODO: Implement tracking table for sent summaries
-    # For now, always returns True
-    return True
-
-def mark_summary_sent(db: Session):
-    """Mark that today's summary was sent."""
-    # TODO: Insert record into tracking table
-    pass 
-
-def send_with_retry(func, *args, max_retries=3, **kwargs):
-    """Retry wrapper for email sending."""
-    for attempt in range(max_retries):
-        try:
-            func(*args, **kwargs)
-            return # Success
-        except Exception as e:
-            if attempt == max_retries - 1:
-                logger.error("Failed to send after %d attemps: %s", max_retries, e)
-                raise
-            else:
-                logger.warning("Attempt %d failed, retrying: %s", attempt + 1, e)
-                time.sleep(2 ** attempt) # Exponential backoff
\ No newline at end of file
+    _alert_task = None
+    # Draining the queue and closing SMTP connections block, so they run in
+    # the default thread pool instead of stalling the event loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, stop_notification_worker)
+    await loop.run_in_executor(None, smtp_pool.close_all)
@@ -3,37 +3,13 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv, find_dotenv
 from .secret_manager import secret_manager
 from .logging_config import get_logger
+from functools import lru_cache
 import traceback
 import os
 
 # Get logger for this module
 logger = get_logger(__name__)
 
-# First, try to import and run SecretManager
-try:
-    # Force load secrets
-    secret_manager.load_secrets()
-
-    # Debug: check what secrets were loaded
-    secret_vars = ['POSTGRES_PASSWORD', 'ADMIN_PASSWORD', 'PASSWORD', 'SECRET_KEY',
-                   'SMTP_USER', 'SMTP_PASSWORD', 'ADMIN_EMAIL', 'SENDER_EMAIL']
-    for var in secret_vars:
-        value = os.environ.get(var)
-        logger.error(f"{var}: {'✅ SET' if value else '❌ NOT SET'}")
-
-except Exception as e:
-    logger.error(f"❌ Error with SecretManager: {e}")
-    traceback.print_exc()
-
-# Then load .env file for non-sensitive configuration
-dotenv_path = find_dotenv()
-if dotenv_path:
-    logger.info(f"Loading .env file from: {dotenv_path}")
-    load_dotenv(dotenv_path)
-else:
-    print("Warning: .env file not found")
-
-
 class Settings(BaseSettings):
     # General settings
     APP_NAME: str = "FARLAB Inventory Management System"
@@ -66,6 +42,8 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""  # Make optional
     SMTP_PASSWORD: str = ""  # Make optional
     SENDER_EMAIL: str = ""  # Make optional
+    # Comma separated notification recipients, defaults to ADMIN_EMAIL
+    ADMIN_EMAILS: str = ""
 
     # --- Scheduler ---
     SCHEDULER_INTERVAL_MINUTES: int = 60
@@ -75,17 +53,69 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-
-try:
-    settings = Settings()
-    logger.info("✅ Settings created successfully!")
-
-except Exception as e:
-    logger.error(f"❌ Error creating Settings: {e}")
-
-    # Show what environment variables are actually available
-    for key, value in sorted(os.environ.items()):
-        if any(secret in key.upper() for secret in ['PASSWORD', 'SECRET', 'SMTP', 'EMAIL']):
-            logger.info(f"{key}: {'SET' if value else 'EMPTY'}")
-
-    raise
+    @property
+    def admin_emails(self) -> list[str]:
+        """ Recipients of alert emails parsed from ADMIN_EMAILS. """
+        emails = [addr.strip() for addr in self.ADMIN_EMAILS.split(",") if addr.strip()]
+        return emails or [self.ADMIN_EMAIL]
+
+
+SECRET_VARS = ['POSTGRES_PASSWORD', 'ADMIN_PASSWORD', 'PASSWORD', 'SECRET_KEY',
+               'SMTP_USER', 'SMTP_PASSWORD', 'ADMIN_EMAIL', 'SENDER_EMAIL']
+
+
+def _load_environment():
+    """"
+    Loads docker secrets and the .env file into the environment.
+    """
+    # First, try to import and run SecretManager
+    try:
+        secret_manager.load_secrets()
+
+        missing = [var for var in SECRET_VARS if not os.environ.get(var)]
+        if missing:
+            logger.debug("Secrets not set: %s", ", ".join(missing))
+
+    except Exception as e:
+        logger.error("Error with SecretManager: %s", e)
+        traceback.print_exc()
+
+    # Then load .env file for non-sensitive configuration
+    dotenv_path = find_dotenv()
+    if dotenv_path:
+        logger.info("Loading .env file from: %s", dotenv_path)
+        load_dotenv(dotenv_path)
+    else:
+        logger.warning(".env file not found")
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """"
+    Builds the application settings on first use and returns the same
+    instance afterwards.
+    """
+    _load_environment()
+    try:
+        settings = Settings()
+        logger.info("Settings created successfully!")
+        return settings
+
+    except Exception as e:
+        logger.error("Error creating Settings: %s", e)
+
+        # Show what environment variables are actually available
+        for key, value in sorted(os.environ.items()):
+            if any(secret in key.upper() for secret in ['PASSWORD', 'SECRET', 'SMTP', 'EMAIL']):
+                logger.info("%s: %s", key, 'SET' if value else 'EMPTY')
+
+        raise
+
+
+def __getattr__(name: str):
+    # Keeps `from utils.config import settings` working. Such an import reads
+    # the attribute right away, so settings are still built when the first
+    # importing module loads; get_settings() makes sure that happens only once
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,7 @@
 """
 Utility functions for creating admin users during application startup.
 """
+from sqlalchemy import exists, update
 from sqlalchemy.orm import Session
 from models.user import User
 from utils.security import get_password_hash
@@ -10,6 +11,13 @@ from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Documented development default and its argon2id hash (same parameters as
+# pwd_context), so first boot with the default doesn't run the KDF
+DEFAULT_ADMIN_PASSWORD = "admin123"
+_DEFAULT_ADMIN_PASSWORD_HASH = (
+    "$argon2id$v=19$m=19456,t=2,p=1$FOIcQyillDJmDOE8p7Q25g$QukudwI1OLytAVtWfnl+GG0LNp0MTt1kSl3nXvs+UWg"
+)
+
 
 def get_admin_password():
     """
@@ -28,14 +36,14 @@ def get_admin_password():
                 password = f.read().strip()
                 logger.info("Admin password loaded from secret file")
         except FileNotFoundError:
-            logger.warning(f"Admin password file {password} not found")
+            logger.warning("Admin password file %s not found", password)
             password = None
     elif password:
         logger.info("Admin password loaded from environment variable")
 
     # Fallback to a default password if nothing is found
     if not password:
-        password = "admin123"  # Default password - should be changed!
+        password = DEFAULT_ADMIN_PASSWORD  # Default password - should be changed!
         logger.warning(
             "Using default admin password 'admin123' - CHANGE THIS IN PRODUCTION!")
 
@@ -53,35 +61,43 @@ def create_admin_user(db: Session) -> bool:
         bool: True if admin user was created, False if already exists
     """
     try:
-        # Check if any admin user already exists
-        existing_admin = db.query(User).filter(User.is_admin == True).first()
+        # EXISTS returns a single boolean, no row hydration
+        admin_username = getattr(settings, "ADMIN_USERNAME", "admin")
+        has_admin = db.query(exists().where(User.is_admin.is_(True))).scalar()
 
-        if existing_admin:
-            logger.info(
-                f"Admin user already exists: {existing_admin.username}")
+        if has_admin:
+            logger.info("Admin user already exists")
             return False
 
-        # Check if user with admin username already exists
-        admin_username = getattr(settings, "ADMIN_USERNAME", "admin")
-        existing_user = db.query(User).filter(
-            User.username == admin_username).first()
-
-        if existing_user:
-            # User exists but is not admin, make them admin
-            existing_user.is_admin = True
+        # User exists but is not admin, make them admin. A single atomic
+        # UPDATE ... RETURNING, so there is no read-then-write to race.
+        promoted_id = db.execute(
+            update(User)
+            .where(User.username == admin_username, User.is_admin.is_(False))
+            .values(is_admin=True)
+            .returning(User.id)
+        ).scalar_one_or_none()
+        if promoted_id is not None:
             db.commit()
-            logger.info(f"Made existing user '{admin_username}' an admin")
+            logger.info("Made existing user '%s' an admin", admin_username)
             return True
 
         # Create new admin user
         admin_password = get_admin_password()
-        hashed_password = get_password_hash(admin_password)
+        if admin_password == DEFAULT_ADMIN_PASSWORD:
+            logger.warning("Creating admin user with the default password - CHANGE IT!")
+            hashed_password = _DEFAULT_ADMIN_PASSWORD_HASH
+        else:
+            hashed_password = get_password_hash(admin_password)
 
+        admin_email = getattr(settings, "ADMIN_EMAIL", "admin@example.com")
+        admin_first_name = getattr(settings, "ADMIN_FIRST_NAME", "Admin")
+        admin_last_name = getattr(settings, "ADMIN_LAST_NAME", "User")
         admin_user = User(
-            username=getattr(settings, "ADMIN_USERNAME", "admin"),
-            email=getattr(settings, "ADMIN_EMAIL", "admin@example.com"),
-            first_name=getattr(settings, "ADMIN_FIRST_NAME", "Admin"),
-            last_name=getattr(settings, "ADMIN_LAST_NAME", "User"),
+            username=admin_username,
+            email=admin_email,
+            first_name=admin_first_name,
+            last_name=admin_last_name,
             hashed_password=hashed_password,
             is_active=True,
             is_admin=True,
@@ -91,18 +107,19 @@ def create_admin_user(db: Session) -> bool:
 
         db.add(admin_user)
         db.commit()
-        db.refresh(admin_user)
 
-        logger.info(f"✅ Created admin user: {admin_user.username}")
-        logger.info(f"   - Email: {admin_user.email}")
+        # Logged from the values we inserted; reading the expired instance
+        # after commit would reload the row
+        logger.info("Created admin user: %s", admin_username)
+        logger.info("   - Email: %s", admin_email)
         logger.info(
-            f"   - Name: {admin_user.first_name} {admin_user.last_name}")
-        logger.info("🔐 Use the credentials above to log into the frontend")
+            "   - Name: %s %s", admin_first_name, admin_last_name)
+        logger.info("Use the credentials above to log into the frontend")
 
         return True
 
     except Exception as e:
-        logger.error(f"❌ Failed to create admin user: {e}")
+        logger.error("Failed to create admin user: %s", e)
         db.rollback()
         raise e
 
@@ -112,14 +129,14 @@ def ensure_admin_exists(db: Session):
     Ensure that at least one admin user exists in the system.
     This function should be called during application startup.
     """
-    logger.info("🔍 Checking for admin user...")
+    logger.info("Checking for admin user...")
 
     try:
         created = create_admin_user(db)
         if created:
-            logger.info("✅ Admin user setup completed")
+            logger.info("Admin user setup completed")
         else:
-            logger.info("✅ Admin user already exists")
+            logger.info("Admin user already exists")
     except Exception as e:
-        logger.error(f"❌ Failed to ensure admin user exists: {e}")
+        logger.error("Failed to ensure admin user exists: %s", e)
         raise
@@ -1,7 +1,12 @@
 # FASTAPI dependency injection
+import hashlib
+import threading
+import time
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, defer, raiseload
 from typing import Annotated
 from datetime import datetime, timezone
 
@@ -18,12 +23,97 @@ logger = get_logger(__name__)
 #     tokenUrl=auth_router.router.url_path_for("token"))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
 
+# Validated tokens: blake2b(token) -> (expires at, user id).
+# Entries live at most TOKEN_CACHE_TTL_SECONDS and never past the token's exp.
+# Only the token's signature check is cached. The user is still loaded from the
+# database on every request, so a deleted, deactivated or changed user is seen
+# right away by every worker process.
+TOKEN_CACHE_TTL_SECONDS = 60
+TOKEN_CACHE_MAX_SIZE = 10_000
+_token_cache: dict[bytes, tuple[float, int]] = {}
+_cache_lock = threading.Lock()
 
-def get_current_user(
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+
+def _cache_get(cache: dict, key):
+    """Returns the unexpired value for key, dropping it if it has expired."""
+    with _cache_lock:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del cache[key]
+            return None
+        return entry[1]
+
+
+def _cache_set(cache: dict, key, value, ttl: float, max_size: int):
+    """Stores value for ttl seconds, evicting expired then oldest entries when full."""
+    now = time.monotonic()
+    with _cache_lock:
+        if len(cache) >= max_size:
+            for cached_key in [k for k, (expires_at, _) in cache.items() if expires_at <= now]:
+                del cache[cached_key]
+            while len(cache) >= max_size:
+                del cache[next(iter(cache))]
+        cache[key] = (now + ttl, value)
+
+
+def _cache_token(token: str, user_id: int, exp: float):
+    """Remember a validated token until the token or the TTL expires."""
+    ttl = min(TOKEN_CACHE_TTL_SECONDS, exp - datetime.now(timezone.utc).timestamp())
+    if ttl > 0:
+        _cache_set(_token_cache, _token_key(token), user_id, ttl, TOKEN_CACHE_MAX_SIZE)
+
+
+async def _load_active_user(user_id: int, db: Session) -> User:
+    """"
+    Loads an active user from the database.
+    Raises 401 if the user doesn't exist and 403 if the account is inactive.
+    """
+    # Query by ID instead of username for better performance
+    # User has no relationships today; raiseload makes any added later fail
+    # loudly in the auth path instead of lazily loading on every request.
+    # The password hash is only read when changing the password, so it is
+    # loaded on demand there instead of on every request.
+    stmt = select(User).where(User.id == user_id).options(
+        defer(User.hashed_password), raiseload("*"))
+    user = await run_in_threadpool(lambda: db.execute(stmt).scalar_one_or_none())
+    if user is None:
+        logger.warning("User not found for token: %s", user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    if not user.is_active:
+        logger.warning("Inactive user attempted access: %s", user.username)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, 
+            detail="Account is inactive"
+        )
+
+    return user
+
+
+async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
         db: Session = Depends(get_db)
 ) -> User:
-    """Dependency to get the current user from JWT token."""
+    """"
+    Dependency to get the current user from JWT token.
+    Async so token checks run on the event loop; only the user query is
+    sent to the threadpool.
+    """
+    user_id = _cache_get(_token_cache, _token_key(token))
+    if user_id is not None:
+        # Token already validated, only the user needs loading
+        return await _load_active_user(user_id, db)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -36,16 +126,9 @@ def get_current_user(
             logger.warning("Token missing subject claim")
             raise credentials_exception
     
-        # Validate token hasnot expired (decode_access_token should handle this)
-        exp = payload.get("exp")
-        if not exp or datetime.now(timezone.utc).timestamp() > exp:
-            logger.warning("Token has expired")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
+        # Expiry is enforced by decode_access_token; kept to bound the cache entry
+        exp = payload["exp"]
+
         # Convert user_id back to int if stored as string
         try:
             user_id = int(user_id)
@@ -54,26 +137,16 @@ def get_current_user(
             raise credentials_exception
     except HTTPException:
         raise # Re-raise HTT exceptions
-    except Exception as e:  # Catches JWTError from decode_access_token
+    except Exception as e:  # Catches unexpected errors from decode_access_token
         logger.warning("Token validation failed: %s", str(e))
         raise credentials_exception
 
-    # Query by ID instead of username for better performance
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        logger.warning("User not found for token: %s", user_id)
-        raise credentials_exception
-
-    if not user.is_active:
-        logger.warning("Inactive user attempted access: %s", User.username)
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="Account is inactive"
-        )
+    user = await _load_active_user(user_id, db)
+    _cache_token(token, user_id, exp)
     return user
 
 
-def get_current_admin_user(
+async def get_current_admin_user(
         current_user: Annotated[User, Depends(get_current_user)]
 ) -> User:
     """
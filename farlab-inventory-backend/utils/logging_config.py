@@ -1,8 +1,15 @@
 # In utils/logging_config.py
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 import sys
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # --- Configuration ---
 LOG_LEVEL = "INFO"  # Set the default log level (e.g. DEBUG, INFO, WARNING)
@@ -12,10 +19,31 @@ LOG_DIR.mkdir(exist_ok=True)  # Create dir if not exist
 LOG_FILE = LOG_DIR / "farlab_inventory.log"  # The name of the log file
 MAX_BYTES = 10 * 1024 * 1024  # 10 MB
 BACKUP_COUNT = 5  # Number of backup log files to keep
+# Emit one JSON object per record (set LOG_JSON=false for plain text)
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() in ("1", "true", "yes")
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Render log records as single-line JSON objects.
+    Avoids the %-style format string assembly of the default formatter.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
 
 # --- Formatter ---
 # Create a formatter to standardize the log message format
-formatter = logging.Formatter(LOG_FORMAT)
+formatter = JSONFormatter() if LOG_JSON else logging.Formatter(LOG_FORMAT)
 
 # --- Handlers ---
 # 1. Console Handler: For printing logs to the console (useful for development)
@@ -24,11 +52,6 @@ console_handler.setFormatter(formatter)
 
 # 2. File handler: For writing logs to a file
 # RotatingFileHandler ensures that log files donot grow indefinetely
-file_handler = RotatingFileHandler(
-    LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT
-)
-file_handler.setFormatter(formatter)
-
 try:
     file_handler = RotatingFileHandler(
         LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT
@@ -42,19 +65,50 @@ except (OSError) as e:
     file_handler = None
     file_logging_enabled = False
 
+# 3. Queue handler: Loggers only enqueue records. A background listener thread
+# formats them and does the console and file I/O (including rollover), so
+# request threads never wait on disk.
+
+
+class RawQueueHandler(QueueHandler):
+    """
+    Enqueue records unformatted. The stock prepare() formats the record in the
+    calling thread and drops exc_info; here only the message args are merged,
+    so formatting (and the JSON exc_info field) happens in the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+log_queue = queue.SimpleQueue()
+queue_handler = RawQueueHandler(log_queue)
+listener = QueueListener(
+    log_queue,
+    *[handler for handler in (console_handler, file_handler) if handler],
+    respect_handler_level=True
+)
+listener.start()
+# Flush queued records on interpreter exit
+atexit.register(listener.stop)
+
 # --- Logger Setup ---
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """"
     Creates and configures a logger instance.
+    Cached so repeated calls for the same name return it directly.
     """
     logger = logging.getLogger(name)
     logger.setLevel(LOG_LEVEL)
 
     # Add handlers only if they havenot been added already
     if not logger.handlers:
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+        logger.addHandler(queue_handler)
 
     return logger
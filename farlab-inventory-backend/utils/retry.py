@@ -0,0 +1,42 @@
+# Shared retry helper with jittered exponential backoff
+import random
+import time
+from typing import Callable
+
+from utils.logging_config import get_logger
+
+# Get a logger for this module
+logger = get_logger(__name__)
+
+MAX_BACKOFF_SECONDS = 30
+
+
+def backoff_delay(attempt: int, max_delay: float = MAX_BACKOFF_SECONDS) -> float:
+    """"
+    Returns a full-jitter delay for the given attempt: a random wait between
+    0 and 2**attempt seconds, capped at max_delay.
+    """
+    return min(max_delay, random.uniform(0, 2 ** attempt))
+
+
+def retry_with_backoff(func: Callable, *args, max_retries: int = 3,
+                       no_retry: tuple[type[BaseException], ...] = (), **kwargs):
+    """"
+    Calls func(*args, **kwargs) up to max_retries times, sleeping a jittered
+    backoff between attempts. Exceptions listed in no_retry and the last
+    attempt's exception are raised to the caller.
+    """
+    for attempt in range(max_retries):
+        try:
+            return func(*args, **kwargs)
+        except no_retry:
+            raise
+        except Exception as e:
+            if attempt == max_retries - 1:
+                logger.error("%s failed after %d attempts: %s",
+                             func.__name__, max_retries, e)
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning("%s attempt %d failed, retrying in %.1fs: %s",
+                           func.__name__, attempt + 1, delay, e)
+            time.sleep(delay)
@@ -1,5 +1,6 @@
 # Update farlab-inventory-backend/utils/secret_manager.py
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from .logging_config import get_logger
@@ -8,9 +9,38 @@ from .logging_config import get_logger
 logger = get_logger(__name__)
 
 
+DOCKER_SECRETS_DIR = '/run/secrets'
+
+# Docker-friendly paths - try in order
+POSSIBLE_SECRETS_FILES = (
+    # Path('/app/secrets/secrets.txt'),  # Docker mount point
+    # Path('/tmp/secrets/secrets.txt'),  # Alternative mount
+    Path('/run/secrets/postgres_secret'),    # Docker secrets
+    Path('/run/secrets/admin_secret'),       # Docker secrets
+    Path('/run/secrets/secret_key'),         # Docker secrets
+    Path('./secrets/secrets.txt'),     # Local development
+    Path('../secrets/secrets.txt'),    # From backend dir
+)
+
+
+@lru_cache(maxsize=1)
+def _find_secrets_file() -> Path:
+    """"
+    Returns the first existing consolidated secrets file. Mounts don't change
+    while the process runs, so the paths are only checked once.
+    """
+    for path in POSSIBLE_SECRETS_FILES:
+        if path.exists():
+            return path
+    # If no existing file found, default to Docker path
+    return Path('/app/secrets/secrets.txt')
+
+
 class SecretManager:
     def __init__(self, secrets_file: Optional[str] = None):
         self._secrets_loaded = False
+        # Secrets read by load_secrets, served by get_secret without touching os.environ
+        self._secrets: dict[str, str] = {}
 
         # Determine the secrets file path with Docker-friendly defaults
         if secrets_file:
@@ -18,29 +48,7 @@ class SecretManager:
         else:
             # Check environment variable first
             env_path = os.environ.get('SECRETS_FILE')
-            if env_path:
-                self.secrets_file = Path(env_path)
-            else:
-                # Docker-friendly paths - try in order
-                possible_paths = [
-                    # Path('/app/secrets/secrets.txt'),  # Docker mount point
-                    # Path('/tmp/secrets/secrets.txt'),  # Alternative mount
-                    Path('/run/secrets/postgres_secret'),    # Docker secrets
-                    Path('/run/secrets/admin_secret'),       # Docker secrets
-                    Path('/run/secrets/secret_key'),         # Docker secrets
-                    Path('./secrets/secrets.txt'),     # Local development
-                    Path('../secrets/secrets.txt'),    # From backend dir
-                ]
-
-                self.secrets_file = None
-                for path in possible_paths:
-                    if path.exists():
-                        self.secrets_file = path
-                        break
-
-                # If no existing file found, default to Docker path
-                if self.secrets_file is None:
-                    self.secrets_file = Path('/app/secrets/secrets.txt')
+            self.secrets_file = Path(env_path) if env_path else _find_secrets_file()
 
     def load_secrets(self) -> None:
         """Load secrets from Docker secret files or consolidated file"""
@@ -50,26 +58,32 @@ class SecretManager:
 
         # Try Docker secrets first (individual files)
         docker_secrets = {
-            'POSTGRES_PASSWORD': '/run/secrets/postgres_secret',
-            'ADMIN_PASSWORD': '/run/secrets/admin_secret',
-            'SECRET_KEY': '/run/secrets/secret_key'
+            'POSTGRES_PASSWORD': 'postgres_secret',
+            'ADMIN_PASSWORD': 'admin_secret',
+            'SECRET_KEY': 'secret_key'
         }
 
-        secrets_loaded = 0
-        for env_var, secret_path in docker_secrets.items():
-            if os.path.exists(secret_path):
+        # One directory listing instead of an exists() check per secret
+        try:
+            entries = {entry.name: entry.path for entry in os.scandir(DOCKER_SECRETS_DIR)}
+        except (FileNotFoundError, NotADirectoryError):
+            entries = {}
+
+        secrets = {}
+        for env_var, filename in docker_secrets.items():
+            if filename in entries:
                 try:
-                    with open(secret_path, 'r', encoding='utf-8') as f:
+                    with open(entries[filename], 'r', encoding='utf-8') as f:
                         value = f.read().strip()
-                        if value and env_var not in os.environ:
-                            os.environ[env_var] = value
-                            secrets_loaded += 1
-                            logger.debug(f"Loaded secret: {env_var}")
+                        if value:
+                            secrets[env_var] = value
+                            logger.debug("Loaded secret: %s", env_var)
                 except Exception as e:
-                    logger.error(f"Error reading secret file {env_var}: {e}")
+                    logger.error("Error reading secret file %s: %s", env_var, e)
 
+        secrets_loaded = self._apply_secrets(secrets)
         if secrets_loaded > 0:
-            logger.info(f"Loaded {secrets_loaded} Docker secrets")
+            logger.info("Loaded %s Docker secrets", secrets_loaded)
             self._secrets_loaded = True
             return
 
@@ -82,11 +96,9 @@ class SecretManager:
         try:
             logger.warning("Reading consolidated secrets file")
 
+            secrets = {}
             with open(self.secrets_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.strip().split('\n')
-
-                for _line_num, line in enumerate(lines, 1):
+                for line in f:
                     line = line.strip()
 
                     # Skip empty lines and comments
@@ -101,25 +113,33 @@ class SecretManager:
                     key = key.strip()
                     value = value.strip()
 
-                    if not key or not value:
-                        continue
-
-                    # Only set if not already in environment
-                    if key not in os.environ:
-                        os.environ[key] = value
-                        secrets_loaded += 1
+                    if key and value:
+                        secrets[key] = value
 
+            secrets_loaded = self._apply_secrets(secrets)
             if secrets_loaded > 0:
-                logger.info(f"Loaded {secrets_loaded} secrets from file")
+                logger.info("Loaded %s secrets from file", secrets_loaded)
             self._secrets_loaded = True
 
         except Exception as e:
-            logger.error(f"Full error details: {str(e)}")
+            logger.error("Full error details: %s", e)
+
+    def _apply_secrets(self, secrets: dict[str, str]) -> int:
+        """"
+        Caches the secrets and exports them in one environ update. Variables
+        already set in the environment win. Returns how many were exported.
+        """
+        new_vars = {key: value for key, value in secrets.items() if key not in os.environ}
+        os.environ.update(new_vars)
+        self._secrets.update({key: os.environ[key] for key in secrets})
+        return len(new_vars)
 
     def get_secret(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """Get a secret value by key"""
         if not self._secrets_loaded:
             self.load_secrets()
+        if key in self._secrets:
+            return self._secrets[key]
         return os.environ.get(key, default)
 
 
@@ -1,19 +1,124 @@
 # Password hashing and JWT token utilities
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
 
 from utils.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. New hashes use argon2id with the OWASP minimum
+# parameters (19 MiB memory, 2 iterations, 1 lane). Existing bcrypt hashes
+# still verify and are upgraded to argon2 on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
+
+# JWT signing and verification inputs resolved once instead of on every call
+_JWT_KEY = settings.SECRET_KEY.encode()
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+# PyJWT checks exp (and rejects expired tokens) whenever the claim is present
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"], "verify_exp": True}
+
+# Dedicated pool for password hashing so async endpoints don't block the event loop.
+# The argon2 and bcrypt C extensions release the GIL, so threads run hashes on other cores.
+_HASH_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="password-hash")
+# Caps hashes queued or running at once so a login storm waits here instead of
+# piling unbounded work onto the pool
+_HASH_SLOTS = asyncio.Semaphore((os.cpu_count() or 1) * 2)
+
+
+# Recently verified passwords: stored hash -> (expires at, HMAC of the plaintext).
+# Only successful verifies are cached, so wrong guesses always pay the full
+# KDF cost. Plaintexts are HMAC'd with the secret key and never leave the process.
+# Keying by the stored hash means a password change misses the cache.
+# Invariant: the cache-hit path must stay constant time like the KDF it
+# replaces, so the plaintext digest is compared with hmac.compare_digest and
+# never with == (or by using it as a dict key).
+VERIFY_CACHE_TTL_SECONDS = 300
+VERIFY_CACHE_MAX_SIZE = 1024
+_verify_cache: dict[str, tuple[float, bytes]] = {}
+_verify_cache_lock = threading.Lock()
+_VERIFY_CACHE_PEPPER = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+
+
+def _password_digest(plain_password: str) -> bytes:
+    return hmac.new(_VERIFY_CACHE_PEPPER, plain_password.encode(), hashlib.sha256).digest()
+
+
+def _recently_verified(plain_password: str, hashed_password: str) -> bool:
+    with _verify_cache_lock:
+        entry = _verify_cache.get(hashed_password)
+        if entry is None:
+            return False
+        if entry[0] <= time.monotonic():
+            del _verify_cache[hashed_password]
+            return False
+    return hmac.compare_digest(entry[1], _password_digest(plain_password))
+
+
+def _remember_verified(plain_password: str, hashed_password: str):
+    digest = _password_digest(plain_password)
+    with _verify_cache_lock:
+        if len(_verify_cache) >= VERIFY_CACHE_MAX_SIZE and hashed_password not in _verify_cache:
+            # Oldest entries go first
+            del _verify_cache[next(iter(_verify_cache))]
+        _verify_cache[hashed_password] = (time.monotonic() + VERIFY_CACHE_TTL_SECONDS, digest)
+
+
+async def _run_in_hash_pool(func, *args):
+    """Runs a password hashing function in the hashing pool, bounded by _HASH_SLOTS."""
+    async with _HASH_SLOTS:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_HASH_POOL, func, *args)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain-text password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    if _recently_verified(plain_password, hashed_password):
+        return True
+    valid = pwd_context.verify(plain_password, hashed_password)
+    if valid:
+        _remember_verified(plain_password, hashed_password)
+    return valid
+
+
+def verify_and_update_password(plain_password: str,
+                               hashed_password: str) -> tuple[bool, Optional[str]]:
+    """"
+    Verifies a password and returns (valid, new_hash). new_hash is set when
+    the stored hash uses a deprecated scheme or parameters and should be
+    replaced.
+    """
+    if _recently_verified(plain_password, hashed_password):
+        return True, None
+    valid, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    # Hashes that need an upgrade are not cached, the login replaces them anyway
+    if valid and new_hash is None:
+        _remember_verified(plain_password, hashed_password)
+    return valid, new_hash
+
+
+def warm_up_password_hashing():
+    """"
+    Loads the passlib backends for every scheme at startup. passlib probes
+    and imports them lazily, which would otherwise land on the first login.
+    """
+    for scheme in pwd_context.schemes():
+        pwd_context.handler(scheme).get_backend()
 
 
 def get_password_hash(password: str) -> str:
@@ -21,6 +126,21 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a password in the hashing pool without blocking the event loop."""
+    if _recently_verified(plain_password, hashed_password):
+        return True
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def averify_and_update_password(plain_password: str,
+                                      hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verifies and upgrades a password hash in the hashing pool."""
+    if _recently_verified(plain_password, hashed_password):
+        return True, None
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a new JWT access token."""
     to_encode = data.copy()
@@ -30,8 +150,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.now(
             timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHMS[0])
     return encoded_jwt
 
 
@@ -40,10 +159,10 @@ def decode_access_token(token: str) -> dict:
     Returns the payload if the token is valid, otherwise raises an exception.
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY,
-                             algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS,
+                             options=_JWT_DECODE_OPTIONS)
         return payload
-    except JWTError:
+    except jwt.InvalidTokenError:  # Includes ExpiredSignatureError
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -1 +1,14 @@
 # Custom validation functions
+import re
+
+# Compiled once at import. The local part allows the RFC 5322 atext characters
+# (e.g. o'brien) and, like the domain, non-ASCII letters (e.g. ø@uio.no).
+# No IDNA normalization.
+EMAIL_RE = re.compile(r"^[\w.!#$%&'*+/=?^`{|}~-]+@[\w.-]+\.[^\W\d_]{2,}$")
+
+
+def validate_email_address(value: str) -> str:
+    """Validate an email address format and return it lower-cased."""
+    if not EMAIL_RE.match(value):
+        raise ValueError("Invalid email address")
+    return value.lower()